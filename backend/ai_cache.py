@@ -0,0 +1,65 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# On-disk cache of Gemini responses shared by the analyzer and the summarizer,
+# so re-processing a meeting reads earlier responses back instead of paying
+# for the API call again
+CACHE_PATH = os.getenv('GEMINI_CACHE_PATH', '.gemini_cache.db')
+
+_local = threading.local()
+_table_lock = threading.Lock()
+_table_ready = False
+
+
+def cache_connection() -> sqlite3.Connection:
+    # One autocommit connection per thread, reused for every lookup and write.
+    # Nothing else holds it, so it closes when its thread's locals are freed.
+    global _table_ready
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_PATH, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        with _table_lock:
+            if not _table_ready:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS ai_responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+                _table_ready = True
+        _local.conn = conn
+    return conn
+
+
+def cache_key(prompt: str, model: str, generation_config: Dict) -> str:
+    config = dict(generation_config)
+    # Key on the schema's fields, not its name, so editing the model
+    # invalidates responses parsed against the old shape
+    schema = config.get("response_schema")
+    if hasattr(schema, "model_json_schema"):
+        config["response_schema"] = schema.model_json_schema()
+    payload = prompt + model + json.dumps(config, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_response(key: str, context: str) -> Optional[str]:
+    try:
+        row = cache_connection().execute(
+            "SELECT response FROM ai_responses WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Response cache lookup failed for %s: %s", context, e)
+        return None
+    return row[0] if row else None
+
+
+def store_response(key: str, response: str, context: str) -> None:
+    try:
+        cache_connection().execute(
+            "INSERT OR REPLACE INTO ai_responses (key, response) VALUES (?, ?)", (key, response))
+    except sqlite3.Error as e:
+        logger.warning("Response cache write failed for %s: %s", context, e)
@@ -1,14 +1,20 @@
 import json
+import orjson
 import re
 import logging
-import difflib
 import google.generativeai as genai
 import os
 
-from dataclasses import dataclass
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Union, Any
 from dotenv import load_dotenv
+from rapidfuzz import fuzz
+from summary_schema import SegmentAnalysis
+from ai_cache import cache_key, get_cached_response, store_response
 
 load_dotenv()
 
@@ -21,18 +27,93 @@ if not GEMINI_API_KEY:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Concurrent Gemini requests per meeting when analyzing segments
+SEGMENT_WORKERS = 8
+
+# Segment text sent per Gemini request; neighbouring segments are merged up to this
+SEGMENT_PROMPT_CHARS = 6000
+
+@dataclass(slots=True)
 class VoteRecord:
     item: str
     outcome: str
     vote_count: str
     vote_type: str
-    context: str
+    context_start: int
+    context_end: int
     position: int
     raw_text: str
     confidence: float = 1.0
+    # Shared reference to the full transcript; context is sliced on demand
+    transcript: str = field(default='', repr=False, compare=False)
+
+    @property
+    def context(self) -> str:
+        return self.transcript[self.context_start:self.context_end]
 
 class CBAnalyzer:
+    # Number word mapping
+    number_words = {
+        'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+        'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15
+    }
+
+    # Articles/prepositions left lowercase by clean_item_text
+    ARTICLES = frozenset({'the', 'a', 'an', 'of', 'in', 'on', 'at', 'to', 'for'})
+
+    # Topic keywords used to label a vote when nothing more specific is found
+    TOPIC_LABELS = {
+        'sidewalk cafe': 'Sidewalk Cafe Application',
+        'liquor license': 'Liquor License Application',
+        'outdoor dining': 'Outdoor Dining Proposal',
+        'zoning': 'Zoning Matter',
+        'landmark': 'Landmark Designation',
+        'budget': 'Budget Item',
+        'housing': 'Housing Proposal',
+        'development': 'Development Application',
+    }
+
+    # Meeting procedure keywords, checked after the topic keywords
+    PROCEDURE_LABELS = {
+        'agenda': 'Agenda Adoption',
+        'minutes': 'Minutes Approval',
+        'adjourn': 'Motion to Adjourn',
+    }
+
+    # Meeting type by title keyword, highest precedence first
+    MEETING_TITLE_TYPES = {
+        'parks': "Parks & Environment Committee meeting",
+        'business': "Business & Consumer Issues Committee meeting",
+        'housing': "Housing Committee meeting",
+        'transportation': "Transportation Committee meeting",
+        'land use': "Land Use Committee meeting",
+        'full board': "Full Board meeting",
+    }
+    # Meeting type by topic keyword when the title has no match
+    MEETING_TOPIC_TYPES = {
+        'parks': "Parks & Environment Committee meeting",
+        'environment': "Parks & Environment Committee meeting",
+        'business': "Business Committee meeting",
+        'restaurant': "Business Committee meeting",
+    }
+    _meeting_title_re = re.compile(
+        '(?=(%s))' % '|'.join(map(re.escape, MEETING_TITLE_TYPES)), re.IGNORECASE)
+    _meeting_topic_re = re.compile(
+        '(?=(%s))' % '|'.join(map(re.escape, MEETING_TOPIC_TYPES)), re.IGNORECASE)
+
+    # Keywords that mark a topic in the regex-only fallback analysis
+    FALLBACK_TOPICS = {
+        'Housing': ['housing', 'affordable', 'apartment', 'development', 'residential'],
+        'Transportation': ['traffic', 'parking', 'bike', 'pedestrian', 'bus', 'subway'],
+        'Business': ['restaurant', 'retail', 'commercial', 'sidewalk cafe', 'liquor license'],
+        'Parks': ['park', 'playground', 'recreation', 'green space'],
+        'Zoning': ['zoning', 'land use', 'permit', 'variance'],
+        'Budget': ['budget', 'funding', 'allocation', 'expense'],
+        'Education': ['school', 'education', 'student', 'teacher'],
+        'Safety': ['safety', 'security', 'police', 'crime']
+    }
+
     def __init__(self):
         self.cb_context = """
         CONTEXT: Community Board (CB) meetings are NYC local government meetings where:
@@ -44,9 +125,23 @@ class CBAnalyzer:
         - Important: CB7 = Community Board 7, covering Upper West Side Manhattan
         """
         
+        # Static instructions shared by every segment request. They go in the
+        # model's system_instruction so each call only sends the segment prompt
+        # and the repeated prefix stays identical for Gemini's prefix caching.
+        self.system_instruction = f"""
+        You are an expert analyst of NYC Community Board meetings. 
+        You must respond with valid JSON only.
+        
+        CRITICAL: Only mark something as a "decision" if there was an ACTUAL VOTE taken.
+        Discussions, suggestions, and proposals are NOT decisions unless voted on.
+        
+        {self.cb_context}
+        """
+        
         # Initialize Gemini
         genai.configure(api_key=GEMINI_API_KEY)
-        self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+        self.gemini_model = genai.GenerativeModel(
+            'gemini-2.0-flash', system_instruction=self.system_instruction)
         
         # Enhanced vote patterns with named groups
         self.vote_patterns = [
@@ -79,12 +174,81 @@ class CBAnalyzer:
             (r'(?:the\s+)?motion\s+has\s+passed', 'motion_passed', 0.95),
         ]
         
-        # Number word mapping
-        self.number_words = {
-            'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-            'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15
+        # Each pattern is scanned on its own so overlapping matches from
+        # different patterns are all reported, as with a plain re.finditer loop.
+        # This stays on the stdlib engine: a DFA scanner like Hyperscan reports
+        # every overlapping match, even of one pattern with itself, by byte
+        # offset and without capture groups, which would change both the
+        # matches finditer returns and the character positions used below.
+        self._vote_res = [(re.compile(p, re.IGNORECASE), vote_type, confidence)
+                          for p, vote_type, confidence in self.vote_patterns]
+        
+        self._subject_address_re = re.compile(
+            r'(\d{1,4}\s+\w+\s+(?:avenue|street|ave|st|broadway))', re.IGNORECASE)
+        # Case-sensitive on purpose: business names are matched by capitalization
+        self._business_patterns = [
+            re.compile(r'(?:for|from|by)\s+([A-Z][A-Za-z\s&]+(?:LLC|Inc|Corp|Restaurant|Cafe|Bar))'),
+            re.compile(r'([A-Z][A-Za-z\s&]+)\s+(?:application|request|proposal)'),
+        ]
+        self._motion_patterns = [
+            re.compile(r'motion\s+to\s+(\w+)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+            re.compile(r'resolution\s+(?:to\s+)?(\w+)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+            re.compile(r'proposal\s+to\s+(\w+)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+        ]
+        self._context_patterns = [
+            re.compile(r'(?:regarding|concerning|about|for)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+            re.compile(r'(?:proposal|application|request)\s+(?:to|for)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+            re.compile(r'(?:discussion\s+of|consideration\s+of)\s+([^.]+?)(?:\.|,|;)', re.IGNORECASE),
+        ]
+        self._date_patterns = [
+            re.compile(r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}', re.IGNORECASE),
+            re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}', re.IGNORECASE),
+            re.compile(r'(?:next|this|last)\s+(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)', re.IGNORECASE),
+            re.compile(r'(?:next|this|last)\s+(?:week|month|year)', re.IGNORECASE),
+        ]
+        self._address_patterns = [
+            re.compile(r'\d{1,4}\s+\w+\s+(?:Avenue|Street|Ave|St|Place|Pl|Road|Rd|Boulevard|Blvd|Broadway)', re.IGNORECASE),
+            re.compile(r'\d{1,4}\s+(?:West|East|North|South)\s+\d{1,3}(?:st|nd|rd|th)\s+Street', re.IGNORECASE),
+        ]
+        # Each family scanned in one pass; group names keep each pattern's hits apart
+        self._date_re = self.union_of(self._date_patterns)
+        self._address_re = self.union_of(self._address_patterns)
+        self._classify_re = re.compile(
+            r'(?P<vote>\b(?:vote|motion|approve|reject|unanimous)\b)'
+            r'|(?P<intro>\b(?:hi|hello|good evening|thank you for|my name is)\b)',
+            re.IGNORECASE)
+        self._dash_re = re.compile(r'[-–]')
+        
+        # Next-step keywords, matched as plain substrings of the lowercased step
+        self._action_re = re.compile('|'.join([
+            'contact', 'visit', 'pick up', 'submit', 'attend',
+            'review', 'send', 'register', 'apply', 'email', 'call']))
+        # Keywords that indicate past events or non-actions
+        self._exclude_re = re.compile('|'.join([
+            'presented', 'discussed', 'was', 'were', 'received',
+            'gave', 'showed', 'explained']))
+        
+        # All subject keywords in one alternation, run over the lowercased
+        # context (much faster than IGNORECASE); hits are ranked by their
+        # position in TOPIC_LABELS then PROCEDURE_LABELS
+        self._subject_labels = {**self.TOPIC_LABELS, **self.PROCEDURE_LABELS}
+        self._subject_priority = {kw: i for i, kw in enumerate(self._subject_labels)}
+        self._subject_label_list = list(self._subject_labels.values())
+        self._subject_keyword_re = re.compile(
+            '|'.join(re.escape(kw) for kw in self._subject_labels))
+        
+        # Fallback topic keywords as one zero-width alternation, longest first,
+        # so every start position reports its longest keyword. Each keyword maps
+        # to the topics of all keywords it starts with ('parking' also means
+        # 'park'), which matches checking each keyword as a substring.
+        fallback_keywords = {kw: topic for topic, kws in self.FALLBACK_TOPICS.items() for kw in kws}
+        self._fallback_keyword_topics = {
+            kw: frozenset(t for other, t in fallback_keywords.items() if kw.startswith(other))
+            for kw in fallback_keywords
         }
+        self._fallback_topic_re = re.compile(
+            '(?=(%s))' % '|'.join(re.escape(kw) for kw in sorted(fallback_keywords, key=len, reverse=True)),
+            re.IGNORECASE)
     
     def safe_extract_string(self, value: Any) -> str:
         if isinstance(value, str):
@@ -117,27 +281,39 @@ class CBAnalyzer:
         if title:
             self._current_title = title
         
-        logger.info(f"Starting enhanced analysis of {len(transcript):,} character transcript")
+        logger.info("Starting enhanced analysis of %d character transcript", len(transcript))
         
         try:
             # Extract all votes with enhanced patterns
             vote_records = self.extract_all_votes(transcript)
-            logger.info(f"Extracted {len(vote_records)} potential votes")
+            logger.info("Extracted %d potential votes", len(vote_records))
             
             # Identify meeting segments with vote awareness
             segments = self.identify_smart_segments(transcript, vote_records)
-            logger.info(f"Identified {len(segments)} meeting segments")
+            logger.info("Identified %d meeting segments", len(segments))
             
-            # Analyze each segment with context
+            # Fewer, denser requests: merge neighbouring segments. Short ones
+            # still go out, since public comment rarely uses vote language;
+            # only blank segments have nothing to analyze.
+            segments = [s for s in self.merge_small_segments(segments) if s['text'].strip()]
+            logger.info("Sending %d segments for analysis", len(segments))
+            
+            # Analyze each segment with context. The Gemini calls are
+            # network-bound, so run them concurrently and keep segment order.
             segment_analyses = []
-            for i, segment in enumerate(segments):
-                logger.info(f"Analyzing segment {i+1}/{len(segments)}: {segment['type']}")
-                try:
-                    analysis = self.analyze_segment_with_context(segment, model, vote_records)
-                    if analysis and isinstance(analysis, dict):
-                        segment_analyses.append(analysis)
-                except Exception as seg_error:
-                    logger.warning(f"Segment {i+1} analysis failed: {seg_error}")
+            with ThreadPoolExecutor(max_workers=SEGMENT_WORKERS) as executor:
+                futures = [
+                    executor.submit(self.analyze_segment_with_context, segment, model, vote_records)
+                    for segment in segments
+                ]
+                for i, (segment, future) in enumerate(zip(segments, futures)):
+                    logger.info("Analyzing segment %d/%d: %s", i + 1, len(segments), segment['type'])
+                    try:
+                        analysis = future.result()
+                        if analysis and isinstance(analysis, dict):
+                            segment_analyses.append(analysis)
+                    except Exception as seg_error:
+                        logger.warning("Segment %d analysis failed: %s", i + 1, seg_error)
             
             # Combine analyses with vote reconciliation
             combined_analysis = self.combine_analyses_smart(segment_analyses, vote_records)
@@ -149,16 +325,16 @@ class CBAnalyzer:
             return final_analysis
             
         except Exception as e:
-            logger.error(f"Enhanced analysis failed: {e}")
-            import traceback
-            logger.debug(f"Full error trace: {traceback.format_exc()}")
+            logger.error("Enhanced analysis failed: %s", e)
+            logger.debug("Full error trace", exc_info=True)
             
             # Return fallback with any votes we found
-            fallback = self.create_enhanced_fallback(transcript)
+            fallback = self.create_enhanced_fallback(
+                transcript, vote_records if 'vote_records' in locals() else None)
             
             # If we found votes before the error, include them
             if 'vote_records' in locals() and vote_records:
-                logger.info(f"Including {len(vote_records)} votes found before error")
+                logger.info("Including %d votes found before error", len(vote_records))
                 fallback['keyDecisions'] = []
                 for vote in vote_records:
                     fallback['keyDecisions'].append({
@@ -188,6 +364,8 @@ class CBAnalyzer:
         all_concerns = []
         all_speakers = []
         all_action_items = []
+        all_dates = []
+        all_addresses = []
         ai_decisions = []
         
         # Process segment analyses with robust type handling
@@ -215,6 +393,10 @@ class CBAnalyzer:
             action_items = self.safe_extract_list(action_items_raw)
             all_action_items.extend(action_items)
             
+            # Extract dates and addresses safely
+            all_dates.extend(self.safe_extract_list(analysis.get('important_dates', [])))
+            all_addresses.extend(self.safe_extract_list(analysis.get('addresses', [])))
+            
             # Extract decisions
             decisions = analysis.get('decisions', [])
             if isinstance(decisions, list):
@@ -230,6 +412,9 @@ class CBAnalyzer:
             }
             combined['keyDecisions'].append(decision)
         
+        # Lowercased items, kept in step with keyDecisions for the match below
+        decision_items = [d['item'].lower() for d in combined['keyDecisions']]
+        
         # AI-detected decisions that aren't already in vote records
         for ai_decision in ai_decisions:
             if not isinstance(ai_decision, dict):
@@ -238,11 +423,10 @@ class CBAnalyzer:
             # Check if this decision matches a vote record
             is_duplicate = False
             ai_item = self.safe_extract_string(ai_decision.get('item', ''))
+            ai_item_lower = ai_item.lower()
             
-            for vote_decision in combined['keyDecisions']:
-                if difflib.SequenceMatcher(None, 
-                    ai_item.lower(), 
-                    vote_decision['item'].lower()).ratio() > 0.7:
+            for vote_decision, decision_item in zip(combined['keyDecisions'], decision_items):
+                if fuzz.ratio(ai_item_lower, decision_item) > 70:
                     # Enhance existing decision with AI context
                     ai_context = self.safe_extract_string(ai_decision.get('context', ''))
                     if ai_context:
@@ -251,6 +435,7 @@ class CBAnalyzer:
                     break
             
             if not is_duplicate and ai_item:
+                decision_items.append(ai_item_lower)
                 combined['keyDecisions'].append({
                     "item": ai_item,
                     "outcome": self.safe_extract_string(ai_decision.get('outcome', 'Discussed')),
@@ -258,10 +443,13 @@ class CBAnalyzer:
                     "details": self.safe_extract_string(ai_decision.get('context', 'Item discussed during meeting'))
                 })
         
-        # Remove duplicates and limit results
-        combined['publicConcerns'] = list(set(all_concerns))[:15]
-        combined['nextSteps'] = self.filter_next_steps(list(set(all_action_items)))[:10]
-        combined['mainTopics'] = list(set(all_topics))[:10]
+        # Remove duplicates (keeping first-seen order) and limit results
+        combined['publicConcerns'] = list(dict.fromkeys(all_concerns))[:15]
+        combined['nextSteps'] = self.filter_next_steps(list(dict.fromkeys(all_action_items)))[:10]
+        combined['mainTopics'] = list(dict.fromkeys(all_topics))[:10]
+        combined['importantDates'] = list(dict.fromkeys(all_dates))[:5]
+        combined['addresses'] = list(dict.fromkeys(all_addresses))[:5]
+        unique_speakers = list(dict.fromkeys(all_speakers))
         
         # Generate summary
         vote_count = len([d for d in combined['keyDecisions'] if 'vote' in d.get('details', '').lower()])
@@ -270,56 +458,67 @@ class CBAnalyzer:
             vote_count, 
             len(combined['publicConcerns']), 
             len(combined['mainTopics']),
-            all_speakers
+            unique_speakers
         )
         
         # Set attendance if speakers identified
-        if all_speakers:
-            unique_speakers = list(set(all_speakers))[:5]
-            combined['attendance'] = f"Speakers included: {', '.join(unique_speakers)}"
-            if len(set(all_speakers)) > 5:
-                combined['attendance'] += f" and {len(set(all_speakers)) - 5} others"
+        if unique_speakers:
+            combined['attendance'] = f"Speakers included: {', '.join(unique_speakers[:5])}"
+            if len(unique_speakers) > 5:
+                combined['attendance'] += f" and {len(unique_speakers) - 5} others"
         
         return combined
     
     def extract_all_votes(self, transcript: str) -> List[VoteRecord]:
-        vote_records = []
+        # Matches are merged in position order, so deduplication runs inline
+        # with the same state deduplicate_votes uses. Sorting is stable, so
+        # matches at the same position keep pattern order.
+        unique_votes = []
+        by_count: Dict[str, List[VoteRecord]] = {}
         
-        for pattern, vote_type, confidence in self.vote_patterns:
-            matches = list(re.finditer(pattern, transcript, re.IGNORECASE))
+        matches = [(match, vote_type, confidence)
+                   for vote_re, vote_type, confidence in self._vote_res
+                   for match in vote_re.finditer(transcript)]
+        matches.sort(key=lambda m: m[0].start())
+        
+        for match, vote_type, confidence in matches:
+            # A nearby accepted vote with equal or higher confidence always
+            # wins, so skip parsing matches that would be dropped anyway
+            if self._outranked(match.start(), confidence, unique_votes):
+                continue
             
-            for match in matches:
-                # Get extended context (1000 chars before and after)
-                start = max(0, match.start() - 1000)
-                end = min(len(transcript), match.end() + 1000)
-                context = transcript[start:end]
-                
-                # Parse the vote details
-                vote_details = self.parse_vote_match(match, vote_type, context)
-                if vote_details:
-                    vote_record = VoteRecord(
-                        item=vote_details['item'],
-                        outcome=vote_details['outcome'],
-                        vote_count=vote_details['vote_count'],
-                        vote_type=vote_type,
-                        context=context,
-                        position=match.start(),
-                        raw_text=match.group(),
-                        confidence=confidence
-                    )
-                    vote_records.append(vote_record)
-        
-        # Sort by position and remove duplicates
-        vote_records.sort(key=lambda x: x.position)
-        return self.deduplicate_votes(vote_records)
+            # Extended context bounds (1000 chars before and after)
+            start = max(0, match.start() - 1000)
+            end = min(len(transcript), match.end() + 1000)
+            
+            # Parse the vote details
+            vote_details = self.parse_vote_match(transcript, match.group(), vote_type, start, end,
+                                                 match.groups())
+            if vote_details:
+                vote_record = VoteRecord(
+                    item=vote_details['item'],
+                    outcome=vote_details['outcome'],
+                    vote_count=vote_details['vote_count'],
+                    vote_type=vote_type,
+                    context_start=start,
+                    context_end=end,
+                    position=match.start(),
+                    raw_text=match.group(),
+                    confidence=confidence,
+                    transcript=transcript
+                )
+                self._merge_vote(vote_record, unique_votes, by_count)
+        
+        return unique_votes
     
-    def parse_vote_match(self, match: re.Match, vote_type: str, context: str) -> Optional[Dict]:
+    def parse_vote_match(self, transcript: str, raw_text: str, vote_type: str, context_start: int,
+                         context_end: int, groups: Tuple[str, ...] = ()) -> Optional[Dict]:
         if vote_type == 'formal_vote':
-            vote_count = match.group(1) if match.lastindex >= 1 else match.group()
-            vote_count = re.sub(r'[-–]', '-', vote_count)  # Normalize dashes
+            vote_count = groups[0] if groups else raw_text
+            vote_count = self._dash_re.sub('-', vote_count)  # Normalize dashes
             
             # Determine what was voted on
-            item = self.extract_vote_subject(context, match.start() - match.string[:match.start()].count('\n'))
+            item = self.extract_vote_subject(transcript, context_start, context_end)
             
             # Parse the vote outcome
             outcome = self.determine_outcome_from_count(vote_count)
@@ -331,7 +530,6 @@ class CBAnalyzer:
             }
             
         elif vote_type == 'verbal_vote':
-            groups = match.groups()
             numbers = []
             for g in groups:
                 if g.lower() in self.number_words:
@@ -343,7 +541,7 @@ class CBAnalyzer:
             
             if len(numbers) == 4:
                 vote_count = '-'.join(numbers)
-                item = self.extract_vote_subject(context, match.start() - match.string[:match.start()].count('\n'))
+                item = self.extract_vote_subject(transcript, context_start, context_end)
                 outcome = self.determine_outcome_from_count(vote_count)
                 
                 return {
@@ -353,7 +551,7 @@ class CBAnalyzer:
                 }
                 
         elif vote_type in ['vote_passes', 'motion_approved', 'unanimous']:
-            item = self.extract_vote_subject(context, 0)
+            item = self.extract_vote_subject(transcript, context_start, context_end)
             return {
                 'item': item,
                 'outcome': 'Approved',
@@ -361,7 +559,7 @@ class CBAnalyzer:
             }
             
         elif vote_type in ['vote_fails', 'motion_rejected']:
-            item = self.extract_vote_subject(context, 0)
+            item = self.extract_vote_subject(transcript, context_start, context_end)
             return {
                 'item': item,
                 'outcome': 'Rejected',
@@ -370,7 +568,7 @@ class CBAnalyzer:
             
         elif vote_type in ['motion', 'resolution']:
             # The item is captured in the regex group
-            item = match.group(1).strip() if match.lastindex >= 1 else "Board Item"
+            item = groups[0].strip() if groups else "Board Item"
             return {
                 'item': self.clean_item_text(item),
                 'outcome': 'Under Consideration',
@@ -378,7 +576,7 @@ class CBAnalyzer:
             }
             
         elif vote_type == 'motion_passed':
-            item = self.extract_vote_subject(context, 0)
+            item = self.extract_vote_subject(transcript, context_start, context_end)
             return {
                 'item': item,
                 'outcome': 'Approved',
@@ -387,78 +585,56 @@ class CBAnalyzer:
             
         return None
     
-    def extract_vote_subject(self, context: str, relative_pos: int) -> str:  
-        context_lower = context.lower()
+    def extract_vote_subject(self, text: str, start: int = 0, end: Optional[int] = None) -> str:  
+        # Searches text[start:end] in place; none of these patterns anchor on
+        # ^ or look behind, so this matches searching a slice
+        if end is None:
+            end = len(text)
         
         # Look for specific application numbers or addresses
-        address_match = re.search(r'(\d{1,4}\s+\w+\s+(?:avenue|street|ave|st|broadway))', context, re.IGNORECASE)
+        address_match = self._subject_address_re.search(text, start, end)
         if address_match:
             return f"Application: {address_match.group(1)}"
         
         # Look for business names
-        business_patterns = [
-            r'(?:for|from|by)\s+([A-Z][A-Za-z\s&]+(?:LLC|Inc|Corp|Restaurant|Cafe|Bar))',
-            r'([A-Z][A-Za-z\s&]+)\s+(?:application|request|proposal)',
-        ]
-        for pattern in business_patterns:
-            match = re.search(pattern, context)
+        for pattern in self._business_patterns:
+            match = pattern.search(text, start, end)
             if match:
                 return f"{match.group(1).strip()} Application"
         
         # Look for motion/resolution context
-        motion_patterns = [
-            r'motion\s+to\s+(\w+)\s+([^.]+?)(?:\.|,|;)',
-            r'resolution\s+(?:to\s+)?(\w+)\s+([^.]+?)(?:\.|,|;)',
-            r'proposal\s+to\s+(\w+)\s+([^.]+?)(?:\.|,|;)',
-        ]
-        for pattern in motion_patterns:
-            match = re.search(pattern, context_lower)
+        for pattern in self._motion_patterns:
+            match = pattern.search(text, start, end)
             if match:
                 action = match.group(1)
                 subject = match.group(2).strip()
                 return f"{action.capitalize()} {self.clean_item_text(subject)}"
         
-        # Topic keywords
-        topics = {
-            'sidewalk cafe': 'Sidewalk Cafe Application',
-            'liquor license': 'Liquor License Application',
-            'outdoor dining': 'Outdoor Dining Proposal',
-            'zoning': 'Zoning Matter',
-            'landmark': 'Landmark Designation',
-            'budget': 'Budget Item',
-            'housing': 'Housing Proposal',
-            'development': 'Development Application',
-        }
-        
-        for keyword, label in topics.items():
-            if keyword in context_lower:
-                return label
-        
-        # Meeting procedure
-        if 'agenda' in context_lower:
-            return 'Agenda Adoption'
-        elif 'minutes' in context_lower:
-            return 'Minutes Approval'
-        elif 'adjourn' in context_lower:
-            return 'Motion to Adjourn'
+        # Topic keywords, then meeting procedure, found in a single scan
+        best = None
+        for m in self._subject_keyword_re.finditer(text[start:end].lower()):
+            priority = self._subject_priority[m.group()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    # Nothing outranks the first keyword, stop scanning
+                    break
+        if best is not None:
+            return self._subject_label_list[best]
         
         return 'Community Board Item'
     
     def clean_item_text(self, text: str) -> str:
-        text = ' '.join(text.split())
-        
-        # Proper capitalization - don't capitalize articles
-        words = text.split()
-        if words:
-            # Capitalize first word and proper nouns, but not articles/prepositions
-            articles = {'the', 'a', 'an', 'of', 'in', 'on', 'at', 'to', 'for'}
-            result = []
-            for i, word in enumerate(words):
-                if i == 0 or word.lower() not in articles:
-                    result.append(word.capitalize())
-                else:
-                    result.append(word.lower())
-            text = ' '.join(result)
+        # A single split normalizes whitespace and drives capitalization:
+        # capitalize first word and proper nouns, but not articles/prepositions
+        result = []
+        for i, word in enumerate(text.split()):
+            word_lower = word.lower()
+            if i == 0 or word_lower not in self.ARTICLES:
+                result.append(word.capitalize())
+            else:
+                result.append(word_lower)
+        text = ' '.join(result)
         
         # Remove trailing punctuation
         text = text.rstrip('.,;:')
@@ -469,7 +645,11 @@ class CBAnalyzer:
         
         return text
     
-    def determine_outcome_from_count(self, vote_count: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def determine_outcome_from_count(vote_count: str) -> str:
+        # Pure function of the tally string, and tallies repeat heavily
+        # within and across meetings, so results are memoized
         if vote_count.lower() == 'unanimous':
             return 'Approved Unanimously'
         
@@ -498,31 +678,64 @@ class CBAnalyzer:
             return []
         
         unique_votes = []
+        # Text similarity only counts for votes with the same tally, so keep
+        # accepted votes bucketed by vote_count and compare within a bucket
+        by_count: Dict[str, List[VoteRecord]] = {}
         
-        for vote in votes:
-            is_duplicate = False
-            
-            for existing in unique_votes:
-                # Same position (within 200 chars)
-                if abs(vote.position - existing.position) < 200:
-                    # Prefer the more specific/confident one
-                    if vote.confidence > existing.confidence:
-                        unique_votes.remove(existing)
-                    else:
-                        is_duplicate = True
-                        break
-                
-                # Similar item text
-                similarity = difflib.SequenceMatcher(None, vote.item.lower(), existing.item.lower()).ratio()
-                if similarity > 0.8 and vote.vote_count == existing.vote_count:
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
-                unique_votes.append(vote)
+        for vote in sorted(votes, key=lambda x: x.position):
+            self._merge_vote(vote, unique_votes, by_count)
         
         return unique_votes
     
+    def _count_nearby(self, position: int, unique_votes: List[VoteRecord]) -> int:
+        # Votes are merged in position order, so the ones within 200 chars
+        # are all at the tail of unique_votes
+        near = 0
+        while near < len(unique_votes) and position - unique_votes[-1 - near].position < 200:
+            near += 1
+        return near
+    
+    def _outranked(self, position: int, confidence: float, unique_votes: List[VoteRecord]) -> bool:
+        # The first nearby vote _merge_vote looks at rejects anything it does
+        # not outrank, without touching the accepted list
+        near = self._count_nearby(position, unique_votes)
+        return bool(near) and confidence <= unique_votes[-near].confidence
+    
+    def _merge_vote(self, vote: VoteRecord, unique_votes: List[VoteRecord],
+                    by_count: Dict[str, List[VoteRecord]]) -> None:
+        # Same outcome as comparing the vote against every accepted one in
+        # position order, as deduplicate_votes originally did
+        near = self._count_nearby(vote.position, unique_votes)
+        nearby = unique_votes[len(unique_votes) - near:]
+        same_count = by_count.setdefault(vote.vote_count, [])
+        item_lower = vote.item.lower()
+        
+        # Distant votes come first and only count when the item text is similar
+        if any(fuzz.ratio(item_lower, existing.item.lower()) > 80
+               for existing in same_count if vote.position - existing.position >= 200):
+            return
+        
+        # Prefer the more specific/confident one. Each nearby vote replaced
+        # was removed from the list being walked, which skipped the one after it.
+        replaced = []
+        accepted = True
+        for existing in nearby[::2]:
+            if vote.confidence <= existing.confidence:
+                accepted = False
+                break
+            replaced.append(existing)
+            if (existing.vote_count == vote.vote_count
+                    and fuzz.ratio(item_lower, existing.item.lower()) > 80):
+                accepted = False
+                break
+        
+        for existing in replaced:
+            unique_votes.remove(existing)
+            by_count[existing.vote_count].remove(existing)
+        if accepted:
+            unique_votes.append(vote)
+            same_count.append(vote)
+    
     def identify_smart_segments(self, transcript: str, votes: List[VoteRecord]) -> List[Dict]:
         segments = []
         
@@ -565,12 +778,33 @@ class CBAnalyzer:
         
         return segments
     
+    def merge_small_segments(self, segments: List[Dict]) -> List[Dict]:
+        # Segments are cut 1000 chars either side of each vote, so most are
+        # only 1000-2000 chars; pack contiguous neighbours into one request up
+        # to the per-request cap, keeping their votes and reclassifying the
+        # combined text
+        merged = []
+        for segment in segments:
+            prev = merged[-1] if merged else None
+            if (prev and prev['end'] == segment['start']
+                    and segment['end'] - prev['start'] <= SEGMENT_PROMPT_CHARS):
+                text = prev['text'] + segment['text']
+                merged[-1] = {
+                    'type': self.classify_segment_content(text),
+                    'text': text,
+                    'start': prev['start'],
+                    'end': segment['end'],
+                    'votes': prev['votes'] + segment['votes']
+                }
+            else:
+                merged.append(segment)
+        return merged
+    
     def classify_segment_content(self, text: str) -> str:
-        text_lower = text.lower()
-        
-        # Count indicators
-        vote_indicators = len(re.findall(r'\b(vote|motion|approve|reject|unanimous)\b', text_lower))
-        intro_indicators = len(re.findall(r'\b(hi|hello|good evening|thank you for|my name is)\b', text_lower))
+        # Count indicators in a single case-insensitive pass
+        counts = Counter(m.lastgroup for m in self._classify_re.finditer(text))
+        vote_indicators = counts['vote']
+        intro_indicators = counts['intro']
         qa_indicators = text.count('?')
         
         if vote_indicators >= 3:
@@ -594,40 +828,20 @@ class CBAnalyzer:
                 vote_context += f"- {vote.item}: {vote.vote_count} ({vote.outcome})\n"
         
         prompt = f"""
-        {self.cb_context}
-        
         Analyze this {segment_type} segment from a Community Board meeting.
         {vote_context}
         
         SEGMENT TEXT:
-        {segment['text'][:6000]}
-        
-        Extract and return a JSON object with:
-        {{
-            "segment_type": "{segment_type}",
-            "main_topics": ["specific topics discussed"],
-            "decisions": [
-                {{"item": "what was decided", "context": "why/details", "vote": "if any"}}
-            ],
-            "concerns": ["specific concerns raised"],
-            "speakers": ["names and roles if mentioned"],
-            "action_items": ["follow-up items mentioned"]
-        }}
+        {segment['text'][:SEGMENT_PROMPT_CHARS]}
         
         Focus on specific details, not general observations.
         """
         
-        return self.get_ai_response(prompt, model, f"{segment_type} segment")
+        return self.get_ai_response(prompt, model, f"{segment_type} segment", SegmentAnalysis)
     
     def extract_vote_context(self, context: str) -> str:
-        context_patterns = [
-            r'(?:regarding|concerning|about|for)\s+([^.]+?)(?:\.|,|;)',
-            r'(?:proposal|application|request)\s+(?:to|for)\s+([^.]+?)(?:\.|,|;)',
-            r'(?:discussion\s+of|consideration\s+of)\s+([^.]+?)(?:\.|,|;)',
-        ]
-        
-        for pattern in context_patterns:
-            match = re.search(pattern, context, re.IGNORECASE)
+        for pattern in self._context_patterns:
+            match = pattern.search(context)
             if match:
                 return f"Regarding {match.group(1).strip()}"
         
@@ -655,7 +869,7 @@ class CBAnalyzer:
         
         # Add speaker info
         if speakers:
-            unique_speakers = list(set(speakers))
+            unique_speakers = list(dict.fromkeys(speakers))
             if len(unique_speakers) <= 3:
                 summary_parts.append(f"Presentations by {', '.join(unique_speakers)}")
             else:
@@ -664,7 +878,8 @@ class CBAnalyzer:
         return ". ".join(summary_parts) + "."
     
     def post_process_analysis(self, analysis: Dict, transcript: str) -> Dict:
-        # Extract any additional metadata
+        # Dates and addresses normally come back from the segment analyses;
+        # only scan the full transcript when Gemini returned none
         if not analysis.get('importantDates'):
             dates = self.extract_dates(transcript)
             analysis['importantDates'] = dates[:5]
@@ -693,35 +908,29 @@ class CBAnalyzer:
         
         return analysis
     
+    @staticmethod
+    def union_of(patterns: List[re.Pattern]) -> re.Pattern:
+        return re.compile(
+            '|'.join(f'(?P<p{i}>{p.pattern})' for i, p in enumerate(patterns)), re.IGNORECASE)
+    
+    @staticmethod
+    def findall_in_pattern_order(union: re.Pattern, text: str) -> List[str]:
+        # Same hits as running findall once per pattern, in pattern order,
+        # from a single scan over text
+        hits = {name: [] for name in union.groupindex}
+        for match in union.finditer(text):
+            hits[match.lastgroup].append(match.group())
+        return [hit for group_hits in hits.values() for hit in group_hits]
+    
     def extract_dates(self, text: str) -> List[str]:
-        date_patterns = [
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}',
-            r'\d{1,2}/\d{1,2}/\d{2,4}',
-            r'(?:next|this|last)\s+(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)',
-            r'(?:next|this|last)\s+(?:week|month|year)',
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
-        
-        return list(set(dates))
+        dates = self.findall_in_pattern_order(self._date_re, text)
+        return list(dict.fromkeys(dates))
     
     def extract_addresses(self, text: str) -> List[str]:
-        address_patterns = [
-            r'\d{1,4}\s+\w+\s+(?:Avenue|Street|Ave|St|Place|Pl|Road|Rd|Boulevard|Blvd|Broadway)',
-            r'\d{1,4}\s+(?:West|East|North|South)\s+\d{1,3}(?:st|nd|rd|th)\s+Street',
-        ]
-        
-        addresses = []
-        for pattern in address_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            addresses.extend(matches)
-        
-        return list(set(addresses))
+        addresses = self.findall_in_pattern_order(self._address_re, text)
+        return list(dict.fromkeys(addresses))
     
-    def get_ai_response(self, prompt: str, model: str, context: str) -> Dict:
+    def get_ai_response(self, prompt: str, model: str, context: str, response_schema=None) -> Dict:
         try:
             # Create the generation config
             generation_config = {
@@ -731,42 +940,47 @@ class CBAnalyzer:
                 "max_output_tokens": 8192,
                 "response_mime_type": "application/json",
             }
+            # Constrain decoding to the schema instead of describing it in the prompt
+            if response_schema is not None:
+                generation_config["response_schema"] = response_schema
             
-            # Add system-like instructions to the prompt
-            enhanced_prompt = f"""
-            You are an expert analyst of NYC Community Board meetings. 
-            You must respond with valid JSON only.
-            
-            CRITICAL: Only mark something as a "decision" if there was an ACTUAL VOTE taken.
-            Discussions, suggestions, and proposals are NOT decisions unless voted on.
+            # Re-analyzing a meeting reuses earlier responses instead of calling
+            # the API; keyed on the configured model, not the routing name
+            key = cache_key(self.system_instruction + prompt, self.gemini_model.model_name,
+                            generation_config)
+            cached = get_cached_response(key, context)
+            if cached is not None:
+                logger.debug("Using cached response for %s", context)
+                return orjson.loads(cached)
             
-            {prompt}
-            """
-            
-            # Generate response
+            # Generate response (instructions are sent as system_instruction)
             response = self.gemini_model.generate_content(
-                enhanced_prompt,
+                prompt,
                 generation_config=generation_config
             )
             
             # Parse JSON response
             if response.text:
-                return json.loads(response.text)
+                result = orjson.loads(response.text)
+                # Only successful parses are cached so failures are retried next run
+                store_response(key, response.text, context)
+                return result
             else:
-                logger.warning(f"Empty response from Gemini for {context}")
+                logger.warning("Empty response from Gemini for %s", context)
                 return {"error": "Empty response"}
                 
         except json.JSONDecodeError as e:
-            logger.warning(f"JSON parsing failed for {context}: {e}")
-            logger.debug(f"Raw response: {response.text if 'response' in locals() else 'No response'}")
+            logger.warning("JSON parsing failed for %s: %s", context, e)
+            logger.debug("Raw response: %s", response.text if 'response' in locals() else 'No response')
             return {"error": f"JSON parsing failed: {e}"}
         
         except Exception as e:
-            logger.warning(f"Gemini analysis failed for {context}: {e}")
+            logger.warning("Gemini analysis failed for %s: %s", context, e)
             return {"error": str(e)}
     
-    def create_enhanced_fallback(self, transcript: str) -> Dict:
-        vote_records = self.extract_all_votes(transcript)
+    def create_enhanced_fallback(self, transcript: str, vote_records: Optional[List[VoteRecord]] = None) -> Dict:
+        if vote_records is None:
+            vote_records = self.extract_all_votes(transcript)
         dates = self.extract_dates(transcript)
         addresses = self.extract_addresses(transcript)
         
@@ -780,23 +994,13 @@ class CBAnalyzer:
                 "details": "Extracted from transcript analysis"
             })
         
-        # Topic detection
-        topics = []
-        topic_keywords = {
-            'Housing': ['housing', 'affordable', 'apartment', 'development', 'residential'],
-            'Transportation': ['traffic', 'parking', 'bike', 'pedestrian', 'bus', 'subway'],
-            'Business': ['restaurant', 'retail', 'commercial', 'sidewalk cafe', 'liquor license'],
-            'Parks': ['park', 'playground', 'recreation', 'green space'],
-            'Zoning': ['zoning', 'land use', 'permit', 'variance'],
-            'Budget': ['budget', 'funding', 'allocation', 'expense'],
-            'Education': ['school', 'education', 'student', 'teacher'],
-            'Safety': ['safety', 'security', 'police', 'crime']
-        }
-        
-        transcript_lower = transcript.lower()
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in transcript_lower for keyword in keywords):
-                topics.append(topic)
+        # Topic detection in one scan over the transcript
+        found = set()
+        for m in self._fallback_topic_re.finditer(transcript):
+            found |= self._fallback_keyword_topics[m.group(1).lower()]
+            if len(found) == len(self.FALLBACK_TOPICS):
+                break
+        topics = [topic for topic in self.FALLBACK_TOPICS if topic in found]
         
         # Build summary
         word_count = len(transcript.split())
@@ -825,49 +1029,39 @@ class CBAnalyzer:
             }
         }
         
+    @staticmethod
+    def first_ranked_label(pattern: re.Pattern, labels: Dict[str, str], text: str) -> Optional[str]:
+        # Return the label of the earliest-listed keyword found anywhere in text
+        ranks = list(labels)
+        best = min((ranks.index(m.group(1).lower()) for m in pattern.finditer(text)), default=None)
+        return labels[ranks[best]] if best is not None else None
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def meeting_type_from_title(title: str) -> Optional[str]:
+        return CBAnalyzer.first_ranked_label(
+            CBAnalyzer._meeting_title_re, CBAnalyzer.MEETING_TITLE_TYPES, title)
+    
     def identify_meeting_type(self, title: str, topics: List[str]) -> str:
-        title_lower = title.lower() if title else ""
-        
         # Check title first
-        if 'parks' in title_lower:
-            return "Parks & Environment Committee meeting"
-        elif 'business' in title_lower:
-            return "Business & Consumer Issues Committee meeting"
-        elif 'housing' in title_lower:
-            return "Housing Committee meeting"
-        elif 'transportation' in title_lower:
-            return "Transportation Committee meeting"
-        elif 'land use' in title_lower:
-            return "Land Use Committee meeting"
-        elif 'full board' in title_lower:
-            return "Full Board meeting"
+        meeting_type = self.meeting_type_from_title(title or "")
+        if meeting_type:
+            return meeting_type
         
         # Check topics if title doesn't help
-        topic_str = ' '.join(topics).lower()
-        if 'parks' in topic_str or 'environment' in topic_str:
-            return "Parks & Environment Committee meeting"
-        elif 'business' in topic_str or 'restaurant' in topic_str:
-            return "Business Committee meeting"
-        
-        return "Community Board meeting"
+        meeting_type = self.first_ranked_label(
+            self._meeting_topic_re, self.MEETING_TOPIC_TYPES, ' '.join(topics))
+        return meeting_type or "Community Board meeting"
 
     def filter_next_steps(self, raw_next_steps: List[str]) -> List[str]:
         filtered = []
         
-        # Keywords that indicate actual action items
-        action_keywords = ['contact', 'visit', 'pick up', 'submit', 'attend', 
-                          'review', 'send', 'register', 'apply', 'email', 'call']
-        
-        # Keywords that indicate past events or non-actions
-        exclude_keywords = ['presented', 'discussed', 'was', 'were', 'received', 
-                           'gave', 'showed', 'explained']
-        
         for step in raw_next_steps:
             step_lower = step.lower()
             
             # Check if it's an actual action
-            has_action = any(keyword in step_lower for keyword in action_keywords)
-            has_exclude = any(keyword in step_lower for keyword in exclude_keywords)
+            has_action = self._action_re.search(step_lower) is not None
+            has_exclude = self._exclude_re.search(step_lower) is not None
             
             if has_action and not has_exclude:
                 filtered.append(step)
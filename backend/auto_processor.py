@@ -7,7 +7,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime
-import requests
+import httpx
 from fetch_videos import CBChannelFetcher
 
 logging.basicConfig(
@@ -17,15 +17,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class AutonomousProcessor:
-    def __init__(self, api_base_url="http://localhost:8000"):
+    def __init__(self, api_base_url="http://localhost:8000", max_videos_per_cycle=1):
         self.api_base_url = api_base_url
+        self.max_videos_per_cycle = max_videos_per_cycle
         self.fetcher = CBChannelFetcher()
+        self.client = httpx.AsyncClient(timeout=60)
         
-    def check_backend_health(self):
+    async def check_backend_health(self):
         """Check if the backend API is running"""
         try:
-            response = requests.get(f"{self.api_base_url}/health")
-            return response.ok
+            response = await self.client.get(f"{self.api_base_url}/health")
+            return response.is_success
         except:
             return False
     
@@ -33,11 +35,11 @@ class AutonomousProcessor:
         """Fetch new videos from YouTube for a specific CB"""
         logger.info(f"Fetching new videos for {cb_key}")
         try:
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.api_base_url}/api/cb/{cb_key}/fetch-videos",
                 params={"max_results": 20}
             )
-            if response.ok:
+            if response.is_success:
                 data = response.json()
                 logger.info(f"Found {data['videos_found']} videos, {data['new_videos']} are new")
                 return data['new_videos']
@@ -55,11 +57,11 @@ class AutonomousProcessor:
             if cb_number:
                 params["cb_number"] = cb_number
                 
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.api_base_url}/api/cb/process-pending",
                 params=params
             )
-            if response.ok:
+            if response.is_success:
                 data = response.json()
                 return data['videos']  # Changed from 'processing' to 'videos'
             else:
@@ -73,10 +75,10 @@ class AutonomousProcessor:
         """Process a single video"""
         logger.info(f"Processing video: {video_id}")
         try:
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.api_base_url}/api/cb/process-video/{video_id}"
             )
-            if response.ok:
+            if response.is_success:
                 data = response.json()
                 logger.info(f"Successfully processed: {data['title']}")
                 return True
@@ -101,29 +103,35 @@ class AutonomousProcessor:
             logger.info("No videos pending processing")
             return
         
-        # 3. Process only ONE video at a time to avoid database locks
-        video = pending[0]  # Take only the first video
+        # 3. Queue up to max_videos_per_cycle videos concurrently (one by default
+        # so background pipelines don't compete for the database)
+        batch = pending[:self.max_videos_per_cycle]
+        results = await asyncio.gather(*(self.queue_video(video) for video in batch))
+        
+        logger.info(f"Cycle complete - queued {sum(results)} of {len(batch)} videos")
+    
+    async def queue_video(self, video):
+        """Queue a pending video for background processing on the backend"""
         logger.info(f"Processing: {video['title']}")
         
         try:
             # Call the process endpoint which now uses background processing
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.api_base_url}/api/cb/process-video/{video['video_id']}"
             )
             
-            if response.ok:
+            if response.is_success:
                 data = response.json()
                 if data.get('success'):
                     logger.info(f"✓ Queued for processing: {video['title']}")
+                    return True
                 else:
                     logger.warning(f"⚠ {data.get('message', 'Unknown issue')}: {video['title']}")
             else:
                 logger.error(f"✗ Failed to queue video {video['video_id']}: {response.text}")
         except Exception as e:
             logger.error(f"✗ Error processing {video['video_id']}: {e}")
-        
-        # Process only one video per cycle
-        logger.info("Cycle complete - processed 1 video")
+        return False
     
     async def run_autonomous(self, interval_minutes=60):
         """Run autonomous processing loop"""
@@ -132,7 +140,7 @@ class AutonomousProcessor:
         while True:
             try:
                 # Check backend health
-                if not self.check_backend_health():
+                if not await self.check_backend_health():
                     logger.error("Backend API is not available. Waiting...")
                     await asyncio.sleep(60)
                     continue
@@ -162,17 +170,22 @@ async def main():
                        help='Run once and exit')
     parser.add_argument('--api-url', default='http://localhost:8000',
                        help='Backend API URL')
+    parser.add_argument('--max-videos', type=int, default=1,
+                       help='Videos to queue per cycle (default: 1)')
     
     args = parser.parse_args()
     
-    processor = AutonomousProcessor(args.api_url)
+    processor = AutonomousProcessor(args.api_url, args.max_videos)
     
-    if args.once:
-        # Run single cycle
-        await processor.process_cycle()
-    else:
-        # Run continuous loop
-        await processor.run_autonomous(args.interval)
+    try:
+        if args.once:
+            # Run single cycle
+            await processor.process_cycle()
+        else:
+            # Run continuous loop
+            await processor.run_autonomous(args.interval)
+    finally:
+        await processor.client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
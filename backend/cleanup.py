@@ -1,14 +1,11 @@
-import pandas as pd, math, re, json, config
+import pandas as pd, numpy as np, re, json, config
 
 FILLERS = r"\b(you know|so,?\s*um+|uh+|like)\b"
-
-def whisper_segments_with_conf(resp: dict):
-    for seg in resp["segments"]:
-        conf = math.exp(seg["avg_logprob"])
-        yield {**seg, "confidence": conf}
+FILLER_RE = re.compile(FILLERS, re.I)
 
 def clean_transcript(resp: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
-    seg_df = pd.DataFrame(whisper_segments_with_conf(resp))
+    seg_df = pd.DataFrame(resp["segments"])
+    seg_df["confidence"] = np.exp(seg_df["avg_logprob"].to_numpy())
 
     # Flag low-confidence lines
     low = seg_df[seg_df.confidence < config.CONF_THRESHOLD]
@@ -16,7 +13,7 @@ def clean_transcript(resp: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
     # Auto-remove filler in high-confidence rows
     hi_mask = seg_df.confidence > config.HIGH_CONF
     seg_df.loc[hi_mask, "text"] = seg_df.loc[hi_mask, "text"].str.replace(
-        FILLERS, "", flags=re.I, regex=True
+        FILLER_RE, "", regex=True
     )
 
     return seg_df, low
@@ -7,7 +7,8 @@ CONF_THRESHOLD = 0.70               # flag for review (lowered from 0.85)
 HIGH_CONF = 0.85                    # allow auto-cleanup (lowered from 0.90)
 USE_DOCKER = False                  # flip if you package later
 WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
-WHISPER_MODEL  = "medium.en"         
+WHISPER_MODEL  = os.getenv("WHISPER_MODEL", "distil-large-v2")  # 2-layer decoder, ~6x faster than large-v2
 WHISPER_PREC   = "int8"      # 2 GB RAM, 4× faster than fp32
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "16"))  # VAD chunks per forward pass; 1 = sequential
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 USE_OPENAI_WHISPER = True
\ No newline at end of file
@@ -2,16 +2,92 @@ import yt_dlp
 import sqlite3
 import logging
 import json
-from datetime import datetime, timedelta
+import orjson
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
+import itertools
 import traceback
 import contextlib
 import time
+import random
+import threading
+import atexit
 
 logger = logging.getLogger(__name__)
 
+# Concurrent channel fetches in fetch_all_channels
+FETCH_WORKERS = 8
+
+# Videos tab only, with upload dates approximated from the listing instead
+# of fetched per video; the same for every channel, so one YoutubeDL per
+# thread serves them all
+YDL_OPTS = {
+    'quiet': True, 'no_warnings': True, 'skip_download': True,
+    'extractor_args': {'youtubetab': {'approximate_date': ['']}}
+}
+
+# Retries for a channel listing that fails transiently (429s, network blips),
+# backing off 0.5s, 1s, 2s, 4s plus jitter between attempts
+FETCH_RETRIES = 4
+FETCH_BACKOFF_BASE = 0.5
+
+# Per-thread cache of decoded meeting listings, bounded in size and age
+MEETINGS_CACHE_SIZE = 64
+MEETINGS_CACHE_TTL = 30
+
+# Fixed SQL text for the hot read queries. Connections are reused per thread,
+# so identical text hits sqlite3's per-connection statement cache every call.
+# The pending queue only needs what a processing run uses, leaving out
+# error_message, which can hold a full traceback per failed row
+_PENDING_VIDEOS_WHERE = """
+    SELECT video_id, title, url, published_at, cb_number, cb_district,
+           channel_source, duration, status, processing_attempts
+    FROM processed_videos 
+    WHERE (
+        status = 'pending' 
+        OR status = 'queued'
+        OR (status = 'processing' AND processed_at < ?)
+        OR (status = 'failed' AND processing_attempts < 3)
+    )
+    AND processing_attempts < 3
+"""
+PENDING_VIDEOS_SQL = _PENDING_VIDEOS_WHERE + ' ORDER BY published_at DESC LIMIT ?'
+PENDING_VIDEOS_FOR_CB_SQL = _PENDING_VIDEOS_WHERE + ' AND cb_number = ? ORDER BY published_at DESC LIMIT ?'
+
+# Pages through processed_videos alone on idx_processed_videos_cb_sort (the
+# ORDER BY must match its expression), then reads analysis_json only for
+# the rows on the page
+MEETINGS_BY_CB_SQL = '''
+    SELECT 
+        p.video_id, p.title, p.url, p.published_at, p.processed_at,
+        p.status, p.cb_number, p.error_message,
+        m.analysis_json, m.transcript_length, p.meeting_date
+    FROM (
+        SELECT video_id, title, url, published_at, processed_at,
+               status, cb_number, error_message, meeting_date
+        FROM processed_videos
+        WHERE cb_number = ?
+        ORDER BY COALESCE(meeting_date, published_at) DESC
+        LIMIT ?
+    ) p
+    LEFT JOIN meeting_analysis m ON m.video_id = p.video_id
+    ORDER BY COALESCE(p.meeting_date, p.published_at) DESC
+'''
+
+# The same page without analysis columns, for listings that only show
+# titles and dates; a pure index walk with no join or JSON to decode
+MEETINGS_BY_CB_LIST_SQL = '''
+    SELECT video_id, title, url, published_at, processed_at,
+           status, cb_number, error_message, meeting_date
+    FROM processed_videos
+    WHERE cb_number = ?
+    ORDER BY COALESCE(meeting_date, published_at) DESC
+    LIMIT ?
+'''
+
 class CBChannelFetcher:
     """Fetch and track videos from Community Board YouTube channels"""
     
@@ -23,109 +99,243 @@ class CBChannelFetcher:
         **{f'cb{i}': {'name': f'Manhattan CB{i}', 'url': '', 'channel_id': '', 'district': 'Manhattan', 'number': i} 
            for i in list(range(1, 7)) + list(range(8, 13))}
     }
+    # CB number -> (district, name, channel key), for tagging rows by number
+    CB_BY_NUMBER = {info['number']: (info['district'], info['name'], key) for key, info in CB_CHANNELS.items()}
+    
+    # Title keywords that mark a meeting video, and ones that rule it out
+    MEETING_TITLE_RE = re.compile(r'meeting|committee|board|session|hearing', re.IGNORECASE)
+    EXCLUDED_TITLE_RE = re.compile(r'highlights|summary|clip', re.IGNORECASE)
+    # CB number spellings as one zero-width alternation, so an "MCB 7" also
+    # reports the "CB 7" inside it; the spellings start with different letters
+    CB_NUMBER_RE = re.compile(
+        r'(?=CB\s*(?P<cb>\d+)|Community Board\s*(?P<community>\d+)|MCB\s*(?P<mcb>\d+))', re.IGNORECASE)
     
     def __init__(self, db_path: str = "cb_meetings.db"):
         self.db_path = Path(db_path)
+        # Channels that can be fetched, with their playlist URL built once
+        self._active_channels = {
+            cb_key: {**cb_info, 'playlist_url': f"{cb_info['url']}/videos"}
+            for cb_key, cb_info in self.CB_CHANNELS.items() if cb_info['url']
+        }
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._downloaders = []
+        # video_ids known to be in processed_videos, loaded on first save
+        self._known_video_ids = None
+        self._known_video_ids_lock = threading.Lock()
+        # Long-lived so its threads, and their YoutubeDL instances, carry over between refreshes
+        self._fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='cb-fetch')
+        atexit.register(self.close_connections)
+        atexit.register(self.close_downloaders)
+
+    def get_thread_connection(self, read_only=False):
+        """Returns this thread's cached connection, opening and configuring it once."""
+        attr = 'conn_ro' if read_only else 'conn_rw'
+        conn = getattr(self._local, attr, None)
+        if conn is None:
+            if read_only:
+                conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+                conn.execute("PRAGMA query_only=ON")
+                # Listing endpoints read large analysis_json rows; serve them from mmap
+                conn.execute("PRAGMA mmap_size=1073741824")
+                conn.execute("PRAGMA cache_size=-131072")
+            else:
+                conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level='IMMEDIATE', check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA cache_size=-20000")
+                conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.row_factory = sqlite3.Row
+            setattr(self._local, attr, conn)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_connections(self):
+        """Closes every cached connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def get_thread_downloader(self) -> yt_dlp.YoutubeDL:
+        """Returns this thread's YoutubeDL, built once; instances are not shared across threads."""
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+            with self._connections_lock:
+                self._downloaders.append(ydl)
+        return ydl
+
+    def close_downloaders(self):
+        """Closes every cached YoutubeDL instance."""
+        self._fetch_executor.shutdown(wait=False)
+        with self._connections_lock:
+            for ydl in self._downloaders:
+                ydl.close()
+            self._downloaders.clear()
 
     @contextlib.contextmanager
     def get_db_connection(self, read_only=False):
         """Provides a database connection as a context manager."""
-        conn = None
-        retry_count = 0
-        max_retries = 3
-        
-        while retry_count < max_retries:
-            try:
-                if read_only:
-                    db_uri = f"file:{self.db_path}?mode=ro&immutable=1"
-                    conn = sqlite3.connect(db_uri, uri=True, timeout=30.0)
-                else:
-                    conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level='IMMEDIATE')
-                    conn.execute("PRAGMA journal_mode=WAL")
-                    conn.execute("PRAGMA busy_timeout=30000")
-                    conn.execute("PRAGMA synchronous=NORMAL")
-                    conn.execute("PRAGMA cache_size=10000")
-                    conn.execute("PRAGMA temp_store=MEMORY")
-                
-                conn.row_factory = sqlite3.Row
-                yield conn
-                
-                if not read_only:
-                    conn.commit()
-                break
-                
-            except sqlite3.OperationalError as e:
-                if "database is locked" in str(e) and retry_count < max_retries - 1:
-                    retry_count += 1
-                    if conn:
-                        conn.close()
-                    time.sleep(0.5 * retry_count)
-                    continue
-                else:
-                    logger.error(f"Database error in CBChannelFetcher: {e}")
-                    raise
-            except Exception as e:
-                logger.error(f"Database error in CBChannelFetcher: {e}")
-                if conn and not read_only:
-                    conn.rollback()
-                raise
-            finally:
-                if conn:
-                    conn.close()
+        conn = self.get_thread_connection(read_only)
+        try:
+            yield conn
+            if not read_only:
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Database error in CBChannelFetcher: {e}")
+            if not read_only:
+                conn.rollback()
+            raise
 
     def fetch_channel_videos(self, cb_key: str, max_results: int = 50) -> List[Dict]:
-        """Fetch recent videos from a CB channel"""
-        cb_info = self.CB_CHANNELS.get(cb_key)
-        if not cb_info or not cb_info['url']:
+        """Fetch up to max_results recent meeting videos from a CB channel"""
+        cb_info = self._active_channels.get(cb_key)
+        if not cb_info:
             return []
         
-        ydl_opts = {'quiet': True, 'extract_flat': True, 'playlist_items': f'1-{max_results}'}
+        ydl = self.get_thread_downloader()
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                # process=False leaves the tab's entries as a lazy generator, so
+                # listing pages are only requested while meeting videos are still needed
+                result = ydl.extract_info(cb_info['playlist_url'], download=False, process=False)
+                if result.get('_type') == 'url':
+                    result = ydl.extract_info(result['url'], download=False, process=False)
+                return self._collect_meeting_videos(cb_key, result.get('entries') or [], max_results)
+            except (yt_dlp.utils.DownloadError, yt_dlp.utils.ExtractorError) as e:
+                # Expected extractor errors (private or missing channel) won't clear up on retry
+                cause = e.exc_info[1] if isinstance(e, yt_dlp.utils.DownloadError) and e.exc_info else e
+                if attempt == FETCH_RETRIES or getattr(cause, 'expected', False):
+                    logger.error(f"Failed to fetch videos from {cb_key} after {attempt + 1} attempts: {e}")
+                    return []
+                delay = FETCH_BACKOFF_BASE * 2 ** attempt + random.random() * 0.25
+                logger.warning(f"Fetch attempt {attempt + 1} for {cb_key} failed, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+            except Exception as e:
+                logger.error(f"Failed to fetch videos from {cb_key}: {e}")
+                return []
+        return []
+
+    def _collect_meeting_videos(self, cb_key: str, entries, max_results: int) -> List[Dict]:
+        """Pull flat entries until max_results meeting videos are kept, scanning at most 3x that many"""
+        cb_info = self._active_channels[cb_key]
+        cb_number, cb_district = cb_info['number'], cb_info['district']
         videos = []
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                result = ydl.extract_info(f"{cb_info['url']}/videos", download=False)
-                if 'entries' in result:
-                    for entry in result.get('entries', []):
-                        if entry and 'id' in entry and self.is_meeting_video(entry.get('title', '')):
-                            videos.append({
-                                'video_id': entry['id'], 'title': entry.get('title', ''),
-                                'url': f"https://www.youtube.com/watch?v={entry['id']}",
-                                'duration': entry.get('duration', 0),
-                                'upload_date': entry.get('upload_date', ''),
-                                'cb_number': cb_info['number'], 'cb_district': cb_info['district'],
-                                'channel_source': cb_key
-                            })
-        except Exception as e:
-            logger.error(f"Failed to fetch videos from {cb_key}: {e}")
+        for entry in itertools.islice(entries, max_results * 3):
+            if not entry or 'id' not in entry:
+                continue
+            title = entry.get('title') or ''
+            if not title or not self.is_meeting_video(title):
+                continue
+            upload_date = entry.get('upload_date') or ''
+            if not upload_date and entry.get('timestamp'):
+                upload_date = datetime.fromtimestamp(entry['timestamp'], timezone.utc).strftime('%Y%m%d')
+            videos.append({
+                'video_id': entry['id'], 'title': title,
+                'url': f"https://www.youtube.com/watch?v={entry['id']}",
+                'duration': entry.get('duration', 0),
+                'upload_date': upload_date,
+                'cb_number': cb_number, 'cb_district': cb_district,
+                'channel_source': cb_key
+            })
+            if len(videos) >= max_results:
+                break
         return videos
     
+    def fetch_all_channels(self, max_results: int = 50) -> List[Dict]:
+        """Fetch recent videos from every CB channel with a URL, concurrently"""
+        cb_keys = list(self._active_channels)
+        if not cb_keys:
+            return []
+        
+        # yt_dlp extraction is network-bound; stay at or under 8 concurrent
+        # channel fetches and stagger submits to avoid YouTube throttling
+        results = {}
+        futures = {}
+        for cb_key in cb_keys:
+            futures[self._fetch_executor.submit(self.fetch_channel_videos, cb_key, max_results)] = cb_key
+            time.sleep(0.1)
+        for future in as_completed(futures):
+            cb_key = futures[future]
+            try:
+                results[cb_key] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to fetch videos from {cb_key}: {e}")
+        
+        return [video for cb_key in cb_keys for video in results.get(cb_key, [])]
+    
     def is_meeting_video(self, title: str) -> bool:
         """Check if video title suggests it's a meeting"""
-        title_lower = title.lower()
-        if any(keyword in title_lower for keyword in ['highlights', 'summary', 'clip']): return False
-        return any(keyword in title_lower for keyword in ['meeting', 'committee', 'board', 'session', 'hearing'])
+        return self.MEETING_TITLE_RE.search(title) is not None and self.EXCLUDED_TITLE_RE.search(title) is None
+    
+    @staticmethod
+    def parse_upload_date(upload_date: str) -> str:
+        """Convert yt_dlp's YYYYMMDD upload_date to an ISO timestamp"""
+        # fromisoformat reads the basic YYYYMMDD form directly and is far
+        # cheaper than strptime, which parses its format string every call
+        if len(upload_date) == 8 and upload_date.isdigit():
+            return datetime.fromisoformat(upload_date).isoformat()
+        return datetime.strptime(upload_date, '%Y%m%d').isoformat()
     
     def save_video_info(self, video: Dict) -> bool:
         """Save video info to database if not already processed"""
+        return self.save_videos_bulk([video]) == 1
+    
+    def _get_known_video_ids(self) -> set:
+        """Returns the set of saved video_ids, reading it from the primary key index once."""
+        with self._known_video_ids_lock:
+            if self._known_video_ids is None:
+                with self.get_db_connection(read_only=True) as conn:
+                    self._known_video_ids = {row[0] for row in conn.execute('SELECT video_id FROM processed_videos')}
+            return self._known_video_ids
+
+    def save_videos_bulk(self, videos: List[Dict]) -> int:
+        """Save new videos in one transaction, skipping any already in the database"""
+        # Rows are never deleted, so a known id is definitely saved; ids added by
+        # other writers just fall through to ON CONFLICT below
+        try:
+            known_ids = self._get_known_video_ids()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load known video ids: {e}")
+            known_ids = set()
+        rows = []
+        for video in videos:
+            if video['video_id'] in known_ids:
+                continue
+            try:
+                upload_date = self.parse_upload_date(video['upload_date']) if video.get('upload_date') else None
+                rows.append((
+                    video['video_id'], video['title'], video['url'], upload_date,
+                    video['cb_number'], video['cb_district'], video['channel_source'], video.get('duration', 0)
+                ))
+            except Exception as e:
+                logger.error(f"Failed to save video {video.get('video_id')}: {e}")
+        if not rows:
+            logger.info(f"Saved 0 new of {len(videos)} videos")
+            return 0
+        
         try:
             with self.get_db_connection() as conn:
-                existing = conn.execute('SELECT video_id FROM processed_videos WHERE video_id = ?', (video['video_id'],)).fetchone()
-                if existing: return False
-                
-                upload_date = datetime.strptime(video.get('upload_date'), '%Y%m%d').isoformat() if video.get('upload_date') else None
-                conn.execute('''
+                # Known video_ids are skipped by the insert itself, no pre-SELECT
+                cursor = conn.executemany('''
                     INSERT INTO processed_videos 
                     (video_id, title, url, published_at, cb_number, cb_district, channel_source, duration, status)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-                ''', (
-                    video['video_id'], video['title'], video['url'], upload_date,
-                    video['cb_number'], video['cb_district'], video['channel_source'], video.get('duration', 0)
-                ))
-            logger.info(f"Saved new video: {video['title'][:50]}...")
-            return True
+                    ON CONFLICT(video_id) DO NOTHING
+                ''', rows)
+                saved = cursor.rowcount
+            with self._known_video_ids_lock:
+                known_ids.update(row[0] for row in rows)
+            logger.info(f"Saved {saved} new of {len(videos)} videos")
+            return saved
         except Exception as e:
-            logger.error(f"Failed to save video {video['video_id']}: {e}")
-            return False
+            logger.error(f"Failed to save {len(rows)} videos: {e}")
+            return 0
     
     def get_pending_videos(self, cb_number: Optional[int] = None, limit: int = 10) -> List[Dict]:
         try:
@@ -133,26 +343,10 @@ class CBChannelFetcher:
                 # Consider videos stuck if processing for more than 30 minutes
                 thirty_minutes_ago = (datetime.now() - timedelta(minutes=30)).isoformat()
                 
-                query = """
-                    SELECT * FROM processed_videos 
-                    WHERE (
-                        status = 'pending' 
-                        OR status = 'queued'
-                        OR (status = 'processing' AND processed_at < ?)
-                        OR (status = 'failed' AND processing_attempts < 3)
-                    )
-                    AND processing_attempts < 3
-                """
-                params = [thirty_minutes_ago]
-                
                 if cb_number:
-                    query += ' AND cb_number = ?'
-                    params.append(cb_number)
-                
-                query += ' ORDER BY published_at DESC LIMIT ?'
-                params.append(limit)
-                
-                rows = conn.execute(query, params).fetchall()
+                    rows = conn.execute(PENDING_VIDEOS_FOR_CB_SQL, (thirty_minutes_ago, cb_number, limit)).fetchall()
+                else:
+                    rows = conn.execute(PENDING_VIDEOS_SQL, (thirty_minutes_ago, limit)).fetchall()
                 
                 videos = []
                 for row in rows:
@@ -170,35 +364,48 @@ class CBChannelFetcher:
             logger.error(f"Failed to get pending videos: {e}")
             return []
 
-    def get_processed_meetings_by_cb(self, cb_number: int, limit: int = 20) -> List[Dict]:
-        """Get all meetings for a specific CB, sorted correctly."""
+    def _meetings_cache(self) -> Dict:
+        """Returns this thread's meetings cache; data_version is per connection, so the cache is too."""
+        cache = getattr(self._local, 'meetings_cache', None)
+        if cache is None:
+            cache = self._local.meetings_cache = {}
+        return cache
+
+    def get_processed_meetings_by_cb(self, cb_number: int, limit: int = 20, include_analysis: bool = True) -> List[Dict]:
+        """Get all meetings for a specific CB, sorted correctly. With include_analysis=False
+        the analysis columns are neither read nor parsed."""
         logger.info(f"Fetching meetings for CB{cb_number} with corrected sorting")
         try:
             with self.get_db_connection(read_only=True) as conn:
+                # data_version moves whenever any other connection (or process)
+                # commits, so a matching version means the cached rows are current
+                data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+                cache = self._meetings_cache()
+                cache_key = (cb_number, limit, include_analysis)
+                cached = cache.get(cache_key)
+                if cached and cached[0] == data_version and cached[1] > time.monotonic():
+                    return cached[2]
+                
                 # *** THIS IS THE FIX ***
                 # Use COALESCE to sort by meeting_date, falling back to published_at if it's NULL.
                 # This ensures a consistent and correct order for all meetings.
-                rows = conn.execute('''
-                    SELECT 
-                        p.video_id, p.title, p.url, p.published_at, p.processed_at,
-                        p.status, p.cb_number, p.error_message,
-                        m.analysis_json, m.transcript_length, m.meeting_date
-                    FROM processed_videos p
-                    LEFT JOIN meeting_analysis m ON p.video_id = m.video_id
-                    WHERE p.cb_number = ?
-                    ORDER BY COALESCE(m.meeting_date, p.published_at) DESC
-                    LIMIT ?
-                ''', (cb_number, limit)).fetchall()
+                sql = MEETINGS_BY_CB_SQL if include_analysis else MEETINGS_BY_CB_LIST_SQL
+                rows = conn.execute(sql, (cb_number, limit)).fetchall()
             
             meetings = []
             for row in rows:
                 meeting_dict = dict(row)
                 if meeting_dict.get('analysis_json'):
                     try:
-                        meeting_dict['analysis'] = json.loads(meeting_dict['analysis_json'])
+                        meeting_dict['analysis'] = orjson.loads(meeting_dict['analysis_json'])
                     except (json.JSONDecodeError, TypeError):
                         meeting_dict['analysis'] = {'summary': 'Error parsing analysis.'}
                 meetings.append(meeting_dict)
+            
+            cache.pop(cache_key, None)
+            if len(cache) >= MEETINGS_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[cache_key] = (data_version, time.monotonic() + MEETINGS_CACHE_TTL, meetings)
             return meetings
         except sqlite3.OperationalError as e:
             logger.error(f"DATABASE LOCKED while fetching for CB{cb_number}: {e}")
@@ -207,11 +414,47 @@ class CBChannelFetcher:
             logger.error(f"Unexpected error in get_processed_meetings_by_cb: {e}\n{traceback.format_exc()}")
             return []
 
+    def bulk_update_cb_from_titles(self, videos: List[Dict]) -> int:
+        """Fill in missing CB numbers (and districts) from video titles in one transaction"""
+        rows = []
+        for video in videos:
+            cb_num = self.infer_cb_from_title(video.get('title') or '')
+            if cb_num is not None:
+                cb_entry = self.CB_BY_NUMBER.get(cb_num)
+                rows.append((cb_num, cb_entry[0] if cb_entry else None, video['video_id']))
+        if not rows:
+            return 0
+        
+        try:
+            with self.get_db_connection() as conn:
+                cursor = conn.executemany(
+                    'UPDATE processed_videos SET cb_number = ?, cb_district = COALESCE(?, cb_district) '
+                    'WHERE video_id = ? AND cb_number IS NULL', rows)
+                updated = cursor.rowcount
+            logger.info(f"Tagged {updated} of {len(videos)} videos with a CB number")
+            return updated
+        except Exception as e:
+            logger.error(f"Failed to tag {len(rows)} videos with CB numbers: {e}")
+            return 0
+
+    def backfill_cb_numbers(self) -> int:
+        """Tag saved videos with no CB number yet (queued by URL or uploaded), reading their titles once"""
+        try:
+            with self.get_db_connection(read_only=True) as conn:
+                videos = [dict(row) for row in conn.execute(
+                    'SELECT video_id, title FROM processed_videos WHERE cb_number IS NULL')]
+        except Exception as e:
+            logger.error(f"Failed to load videos without a CB number: {e}")
+            return 0
+        return self.bulk_update_cb_from_titles(videos)
+
     def infer_cb_from_title(self, title: str) -> Optional[int]:
         """Try to determine CB number from video title"""
-        for pattern in [r'CB\s*(\d+)', r'Community Board\s*(\d+)', r'MCB\s*(\d+)']:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                cb_num = int(match.group(1))
-                if 1 <= cb_num <= 12: return cb_num
+        # First number seen for each spelling, tried in CB_NUMBER_RE's group order
+        first_numbers = {}
+        for match in self.CB_NUMBER_RE.finditer(title):
+            first_numbers.setdefault(match.lastgroup, int(match.group(match.lastgroup)))
+        for group in self.CB_NUMBER_RE.groupindex:
+            cb_num = first_numbers.get(group)
+            if cb_num is not None and 1 <= cb_num <= 12: return cb_num
         return None
@@ -1,6 +1,6 @@
 import tempfile
 import shutil
-import json
+import orjson
 import sqlite3
 import time
 import logging
@@ -10,6 +10,9 @@ import re
 import asyncio
 import contextlib
 import os
+import importlib.util
+import threading
+import atexit
 import uvicorn
 import yt_dlp
 import random
@@ -26,7 +29,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict
 from openai import OpenAI
-from config import USE_OPENAI_WHISPER, OPENAI_API_KEY
+from config import USE_OPENAI_WHISPER, OPENAI_API_KEY, WHISPER_MODEL, WHISPER_DEVICE, WHISPER_PREC, WHISPER_BATCH_SIZE
 
 # Import the summarization modules
 from summarize import summarize_transcript, MeetingSummary
@@ -42,6 +45,12 @@ class ProcessRequest(BaseModel):
     cb_number: Optional[int] = None
 
 
+class HealthStatus(BaseModel):
+    whisper: bool
+    ffmpeg: bool
+    database: bool
+
+
 app = FastAPI(title="CB Meeting Processor", version="1.5.5")  # Version bump
 app.add_middleware(
     CORSMiddleware,
@@ -56,10 +65,34 @@ app.add_middleware(
     allow_methods=["*"], allow_headers=["*"])
 
 whisper_model = None
+# Local faster-whisper model, loaded on first transcription
+local_whisper_model = None
+local_whisper_lock = threading.Lock()
+# Background tasks overlap one video's download and analysis with another's
+# transcription; the local model itself runs one transcription at a time
+local_transcribe_slot = threading.BoundedSemaphore(1)
 db_path = Path("cb_meetings.db")
 output_dir = Path("processed_meetings")
 
 
+def transcription_audio_opts() -> Dict:
+    # yt-dlp options for audio headed straight into transcription
+    if whisper_model == "local":
+        # faster-whisper decodes and resamples the downloaded stream itself,
+        # so skip the re-encode and hand it the original file
+        return {}
+    # Whisper only uses 16 kHz mono; encoding to that once keeps an hour of
+    # speech around 15 MB, under the API's 25 MB upload limit
+    return {
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '32',
+        }],
+        'postprocessor_args': {'extractaudio': ['-ar', '16000', '-ac', '1']},
+    }
+
+
 class ProxyVideoProcessor:
     def __init__(self):
         self.proxy_url = os.getenv('PROXY_URL')
@@ -99,11 +132,7 @@ class ProxyVideoProcessor:
         
         ydl_opts = {
             'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '128',
-            }],
+            **transcription_audio_opts(),
             'outtmpl': output_template,
             'quiet': False,
             'verbose': True,
@@ -139,7 +168,7 @@ class ProxyVideoProcessor:
                     
                     # Get the actual output filename
                     filename = ydl.prepare_filename(info)
-                    audio_file = filename.rsplit('.', 1)[0] + '.mp3'
+                    audio_file = filename.rsplit('.', 1)[0] + '.mp3' if 'postprocessors' in ydl_opts else filename
                     
                     if os.path.exists(audio_file):
                         file_size_mb = os.path.getsize(audio_file) / (1024 * 1024)
@@ -194,63 +223,90 @@ class ProxyVideoProcessor:
             return False, f"Web Unlocker test failed: {str(e)}"
 
 class CBProcessor:
+    # Bump whenever init_database gains a table, column or index
+    SCHEMA_VERSION = 2
+
+    # (pattern, is_month_name) pairs tried in order by extract_meeting_date
+    MEETING_DATE_PATTERNS = [
+        (re.compile(r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+(\d{1,2}),?\s+(\d{4})'), True),
+        (re.compile(r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})'), False),
+        (re.compile(r'(\d{4})-(\d{2})-(\d{2})'), False),
+    ]
+    MONTHS = {
+        'january': '01', 'february': '02', 'march': '03', 'april': '04',
+        'may': '05', 'june': '06', 'july': '07', 'august': '08',
+        'september': '09', 'october': '10', 'november': '11', 'december': '12'
+    }
+
     def __init__(self):
         # Define instance attributes
         self.db_path = Path("cb_meetings.db")
         self.output_dir = Path("processed_meetings")
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close_connections)
         # Initialize
         self.output_dir.mkdir(exist_ok=True)
         self.init_database()
         self.load_models()
         self.proxy_processor = ProxyVideoProcessor()
 
+    def get_thread_connection(self, read_only=False):
+        # One read-write and one read-only connection per thread, configured once
+        attr = 'conn_ro' if read_only else 'conn_rw'
+        conn = getattr(self._local, attr, None)
+        if conn is None:
+            if read_only:
+                conn = sqlite3.connect(
+                    str(self.db_path), timeout=30.0, check_same_thread=False)
+                conn.execute("PRAGMA query_only=ON")
+                # Reads of large analysis_json rows come straight from mmap
+                conn.execute("PRAGMA cache_size=-131072")
+                conn.execute("PRAGMA mmap_size=1073741824")
+            else:
+                conn = sqlite3.connect(
+                    str(self.db_path), timeout=30.0, isolation_level='IMMEDIATE', check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA cache_size=-65536")
+                conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.row_factory = sqlite3.Row
+            setattr(self._local, attr, conn)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_connections(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
     @contextlib.contextmanager
     def get_db_connection(self, read_only=False):
-        conn = None
-        retry_count = 0
-        max_retries = 3
-
-        while retry_count < max_retries:
-            try:
-                if read_only:
-                    db_uri = f"file:{self.db_path}?mode=ro&immutable=1"
-                    conn = sqlite3.connect(db_uri, uri=True, timeout=30.0)
-                else:
-                    conn = sqlite3.connect(
-                        str(self.db_path), timeout=30.0, isolation_level='IMMEDIATE')
-                    conn.execute("PRAGMA journal_mode=WAL")
-                    conn.execute("PRAGMA busy_timeout=30000")
-                    conn.execute("PRAGMA synchronous=NORMAL")
-                    conn.execute("PRAGMA cache_size=10000")
-                    conn.execute("PRAGMA temp_store=MEMORY")
-
-                conn.row_factory = sqlite3.Row
-                yield conn
-
-                if not read_only:
-                    conn.commit()
-                break
-
-            except sqlite3.OperationalError as e:
-                if "database is locked" in str(e) and retry_count < max_retries - 1:
-                    retry_count += 1
-                    if conn:
-                        conn.close()
-                    time.sleep(0.5 * retry_count)  # Exponential backoff
-                    continue
-                else:
-                    raise
-            except Exception:
-                if conn and not read_only:
-                    conn.rollback()
-                raise
-            finally:
-                if conn:
-                    conn.close()
+        # Connections stay open for reuse; busy_timeout handles lock waits
+        conn = self.get_thread_connection(read_only)
+        try:
+            yield conn
+            if not read_only:
+                conn.commit()
+        except Exception:
+            if not read_only:
+                conn.rollback()
+            raise
 
     def init_database(self):
         try:
             with self.get_db_connection() as conn:
+                # Tables, column migrations and indexes below are all in place once
+                # user_version reaches SCHEMA_VERSION, so later starts skip them
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                    logger.info("Database schema is up to date.")
+                    return
+
                 conn.executescript('''
                     CREATE TABLE IF NOT EXISTS processed_videos (
                         video_id TEXT PRIMARY KEY, 
@@ -264,7 +320,8 @@ class CBProcessor:
                         processing_attempts INTEGER DEFAULT 0, 
                         cb_number INTEGER, 
                         cb_district TEXT,
-                        channel_source TEXT
+                        channel_source TEXT,
+                        meeting_date TEXT
                     );
                     CREATE TABLE IF NOT EXISTS meeting_analysis (
                         video_id TEXT PRIMARY KEY, 
@@ -296,6 +353,31 @@ class CBProcessor:
                 except sqlite3.OperationalError:
                     pass
 
+                # meeting_date is mirrored from meeting_analysis so the meetings
+                # listing can sort and page without a join
+                try:
+                    conn.execute(
+                        "ALTER TABLE processed_videos ADD COLUMN meeting_date TEXT;")
+                except sqlite3.OperationalError:
+                    pass
+
+                conn.executescript(f'''
+                    -- Per-CB listings and the pending queue filter on cb_number and
+                    -- order by published_at
+                    CREATE INDEX IF NOT EXISTS idx_processed_videos_cb_published ON processed_videos (cb_number, published_at DESC);
+                    -- The pending queue keeps only rows under the retry limit and walks
+                    -- them newest first, stopping at its LIMIT
+                    CREATE INDEX IF NOT EXISTS idx_processed_videos_retryable ON processed_videos (published_at DESC) WHERE processing_attempts < 3;
+                    -- The meetings listing pages each CB by its display date
+                    UPDATE processed_videos SET meeting_date = (
+                        SELECT ma.meeting_date FROM meeting_analysis ma WHERE ma.video_id = processed_videos.video_id)
+                    WHERE meeting_date IS NULL;
+                    CREATE INDEX IF NOT EXISTS idx_processed_videos_cb_sort ON processed_videos (cb_number, COALESCE(meeting_date, published_at) DESC);
+                    DROP INDEX IF EXISTS idx_meeting_analysis_video_date;
+                    ANALYZE;
+                    PRAGMA user_version = {self.SCHEMA_VERSION};
+                ''')
+
             logger.info("Database initialized successfully.")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
@@ -310,11 +392,36 @@ class CBProcessor:
                         "OPENAI_API_KEY environment variable not set")
                 whisper_model = "openai_api"
                 logger.info("Using OpenAI Whisper API")
+            else:
+                # Weights load on the first transcription, so a server that only
+                # serves listings never holds them; just check the backend exists
+                if importlib.util.find_spec("faster_whisper") is None:
+                    raise Exception(
+                        "faster-whisper is not installed")
+                whisper_model = "local"
+                logger.info(f"Using local faster-whisper {WHISPER_MODEL} ({WHISPER_PREC}, batch {WHISPER_BATCH_SIZE}), loaded on first use")
 
         except Exception as e:
             logger.error(f"Model loading failed: {e}")
             raise
 
+    def get_local_whisper_model(self):
+        global local_whisper_model
+        with local_whisper_lock:
+            if local_whisper_model is None:
+                # Local transcription on CTranslate2 with quantized weights;
+                # only needed when the OpenAI API is switched off
+                from faster_whisper import WhisperModel, BatchedInferencePipeline
+                model = WhisperModel(
+                    WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_PREC)
+                if WHISPER_BATCH_SIZE > 1:
+                    # Splits audio at VAD boundaries into ~30s chunks and decodes
+                    # them as padded batches instead of one long sequential pass
+                    model = BatchedInferencePipeline(model=model)
+                local_whisper_model = model
+                logger.info(f"Loaded local faster-whisper {WHISPER_MODEL}")
+            return local_whisper_model
+
     def check_ffmpeg(self) -> bool: return shutil.which("ffmpeg") is not None
 
     def clean_youtube_url(self, url: str) -> str:
@@ -365,11 +472,7 @@ class CBProcessor:
         ydl_opts = {
             'format': 'bestaudio/best',
             'outtmpl': str(output_template),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192'
-            }],
+            **transcription_audio_opts(),
             'quiet': False,  # Set to False to see errors
             'no_warnings': False,
             # Add these options
@@ -419,6 +522,19 @@ class CBProcessor:
                     pass
 
     def transcribe_audio(self, audio_path: str) -> str:
+        if whisper_model == "local":
+            try:
+                # Greedy decoding, and the VAD filter drops silence before it reaches the decoder
+                options = {"batch_size": WHISPER_BATCH_SIZE} if WHISPER_BATCH_SIZE > 1 else {}
+                model = self.get_local_whisper_model()
+                with local_transcribe_slot:
+                    # segments is lazy; decoding happens while it is joined
+                    segments, _ = model.transcribe(
+                        audio_path, language="en", beam_size=1, vad_filter=True, **options)
+                    return " ".join(segment.text.strip() for segment in segments).strip()
+            except Exception as e:
+                raise Exception(f"Local Whisper transcription failed: {str(e)}")
+
         try:
             client = OpenAI(api_key=OPENAI_API_KEY)
 
@@ -455,28 +571,18 @@ class CBProcessor:
         More robustly extracts a meeting date by checking title, then the start of the transcript,
         and finally the entire transcript before defaulting.
         """
-        date_patterns = [
-            r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+(\d{1,2}),?\s+(\d{4})',
-            r'(\d{1,2})[/-](\d{1,2})[/-](\d{4})',
-            r'(\d{4})-(\d{2})-(\d{2})'
-        ]
-        months = {
-            'january': '01', 'february': '02', 'march': '03', 'april': '04',
-            'may': '05', 'june': '06', 'july': '07', 'august': '08',
-            'september': '09', 'october': '10', 'november': '11', 'december': '12'
-        }
-
         def find_date_in_text(text: str):
-            for pattern in date_patterns:
-                match = re.search(pattern, text.lower())
+            text_lower = text.lower()
+            for pattern, is_month_name in self.MEETING_DATE_PATTERNS:
+                match = pattern.search(text_lower)
                 if match:
-                    if 'january' in pattern.lower():
-                        month_name = match.group(1).lower()
-                        month = months.get(month_name, '01')
+                    if is_month_name:
+                        month_name = match.group(1)
+                        month = self.MONTHS.get(month_name, '01')
                         day = match.group(2).zfill(2)
                         year = match.group(3)
                         return f"{year}-{month}-{day}"
-                    elif len(match.groups()) == 3 and ('/' in pattern or '-' in pattern):
+                    else:
                         m1, m2, m3 = match.groups()
                         if len(m3) == 4:
                             return f"{m3}-{m1.zfill(2)}-{m2.zfill(2)}"
@@ -518,12 +624,20 @@ class CBProcessor:
         }
         return analysis, summary_obj
 
-    def save_results(self, video_id: str, analysis: Dict, transcript: str, processing_time: float, meeting_date: str):
+    def save_results(self, video_id: str, analysis: Dict, transcript: str, processing_time: float, meeting_date: str, title: str = None):
+        # Analysis, transcript and the completed status go in one transaction
         with self.get_db_connection() as conn:
             conn.execute('INSERT OR REPLACE INTO meeting_analysis (video_id, analysis_json, transcript_length, processing_time, created_at, meeting_date) VALUES (?, ?, ?, ?, ?, ?)',
-                         (video_id, json.dumps(analysis), len(transcript), processing_time, datetime.now().isoformat(), meeting_date))
+                         (video_id, orjson.dumps(analysis, option=orjson.OPT_NON_STR_KEYS).decode(), len(transcript), processing_time, datetime.now().isoformat(), meeting_date))
             conn.execute(
                 'INSERT OR REPLACE INTO transcripts (video_id, transcript_text) VALUES (?, ?)', (video_id, transcript))
+            conn.execute("""
+                INSERT INTO processed_videos (video_id, title, status, meeting_date) VALUES (?, ?, 'completed', ?)
+                ON CONFLICT(video_id) DO UPDATE SET 
+                    status = 'completed', 
+                    error_message = NULL,
+                    meeting_date = excluded.meeting_date
+            """, (video_id, title, meeting_date))
         logger.info(f"Analysis and transcript saved for {video_id}")
 
 
@@ -581,16 +695,7 @@ def core_video_processing_logic(video_id: str, title: str, url: str):
         # Stage 4: Saving results
         current_stage = "saving_results"
         processor.save_results(
-            video_id, analysis, transcript, time.time() - start_time, meeting_date)
-
-        # Final status update
-        with processor.get_db_connection() as conn:
-            conn.execute("""
-                UPDATE processed_videos 
-                SET status = 'completed', 
-                    error_message = NULL 
-                WHERE video_id = ?
-            """, (video_id,))
+            video_id, analysis, transcript, time.time() - start_time, meeting_date, title)
 
         logger.info(
             f"BACKGROUND: Processing for {video_id} completed successfully in {time.time() - start_time:.2f}s")
@@ -622,19 +727,10 @@ async def health_check():
     except Exception as e:
         logger.error(f"Health check DB error: {e}")
 
-    try:
-        from config import USE_OPENAI_WHISPER, OPENAI_API_KEY
-        if USE_OPENAI_WHISPER:
-            whisper_ok = bool(OPENAI_API_KEY)
-        else:
-            whisper_ok = whisper_model is not None
-    except Exception:
-        whisper_ok = False
-
-    class HealthStatus(BaseModel):
-        whisper: bool
-        ffmpeg: bool
-        database: bool
+    if USE_OPENAI_WHISPER:
+        whisper_ok = bool(OPENAI_API_KEY)
+    else:
+        whisper_ok = whisper_model is not None
 
     return HealthStatus(
         whisper=whisper_ok,
@@ -661,8 +757,20 @@ async def process_youtube_video_async(request: ProcessRequest, background_tasks:
             cb_number = request.cb_number if request.cb_number is not None else cb_fetcher.infer_cb_from_title(
                 title)
 
-            conn.execute('INSERT OR REPLACE INTO processed_videos (video_id, title, url, published_at, status, cb_number) VALUES (?, ?, ?, ?, ?, ?)',
-                         (video_id, title, request.url, video_info.get('upload_date'), 'queued', cb_number))
+            # Upsert rather than replace, so a re-queued video keeps the
+            # meeting_date mirrored from its earlier analysis
+            conn.execute("""
+                INSERT INTO processed_videos (video_id, title, url, published_at, status, cb_number)
+                VALUES (?, ?, ?, ?, 'queued', ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    title = excluded.title,
+                    url = excluded.url,
+                    published_at = excluded.published_at,
+                    status = excluded.status,
+                    cb_number = excluded.cb_number,
+                    error_message = NULL,
+                    processing_attempts = 0
+            """, (video_id, title, request.url, video_info.get('upload_date'), cb_number))
 
         background_tasks.add_task(
             core_video_processing_logic, video_id, title, request.url)
@@ -690,18 +798,15 @@ async def process_file(file: UploadFile = File(...)):
             transcript, file.filename, meeting_date)
 
         processor.save_results(
-            video_id, analysis, transcript, time.time() - start_time, meeting_date)
-        with processor.get_db_connection() as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO processed_videos (video_id, title, status) VALUES (?, ?, 'completed')", (video_id, file.filename))
+            video_id, analysis, transcript, time.time() - start_time, meeting_date, file.filename)
 
         return {"success": True, "title": file.filename, "analysis": analysis}
 
 
 @app.get("/api/cb/{cb_number}/meetings")
-async def get_cb_meetings(cb_number: int, limit: int = 20):
+async def get_cb_meetings(cb_number: int, limit: int = 20, include_analysis: bool = True):
     try:
-        meetings = await asyncio.to_thread(cb_fetcher.get_processed_meetings_by_cb, cb_number, limit)
+        meetings = await asyncio.to_thread(cb_fetcher.get_processed_meetings_by_cb, cb_number, limit, include_analysis)
         return {"cb_number": cb_number, "meetings": meetings, "total": len(meetings)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -711,13 +816,24 @@ async def get_cb_meetings(cb_number: int, limit: int = 20):
 async def fetch_cb_videos(cb_key: str, max_results: int = 20):
     try:
         videos = await asyncio.to_thread(cb_fetcher.fetch_channel_videos, cb_key, max_results)
-        new_count = sum(
-            1 for video in videos if cb_fetcher.save_video_info(video))
+        new_count = cb_fetcher.save_videos_bulk(videos)
+        cb_fetcher.backfill_cb_numbers()
         return {"cb_key": cb_key, "videos_found": len(videos), "new_videos": new_count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/cb/fetch-all-videos")
+async def fetch_all_cb_videos(max_results: int = 20):
+    try:
+        videos = await asyncio.to_thread(cb_fetcher.fetch_all_channels, max_results)
+        new_count = cb_fetcher.save_videos_bulk(videos)
+        cb_fetcher.backfill_cb_numbers()
+        return {"videos_found": len(videos), "new_videos": new_count}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/cb/process-pending")
 async def get_pending_videos(cb_number: Optional[int] = None, limit: int = 5):
     try:
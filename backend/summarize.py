@@ -1,14 +1,20 @@
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from pydantic import ValidationError
 from summary_schema import MeetingSummary, Topic, Decision
+from ai_cache import cache_key, get_cached_response, store_response
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-MODEL = genai.GenerativeModel("gemini-2.0-flash")
+MODEL_NAME = "gemini-2.0-flash"
+MODEL = genai.GenerativeModel(MODEL_NAME)
 
 SYSTEM_PROMPT = """
 You are an expert NYC Community Board meeting analyst creating comprehensive summaries for public records.
@@ -43,33 +49,97 @@ CRITICAL REQUIREMENTS:
 Return ONLY valid JSON matching the provided schema.
 """.strip()
 
-def call_gemini(system_prompt: str, user_text: str) -> str:
+GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "max_output_tokens": 8192,
+    "response_mime_type": "application/json",
+}
+
+def parse_json_response(text: str):
+    """Parse a JSON response, unwrapping a ```json fence; None if it is not JSON"""
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+def call_gemini(system_prompt: str, user_text: str):
+    """Return the parsed JSON response, or None if the output is not JSON"""
     combined_prompt = f"{system_prompt}\n\n{user_text}"
+    # Shares the analyzer's on-disk response cache
+    key = cache_key(combined_prompt, MODEL_NAME, GENERATION_CONFIG)
+    cached = get_cached_response(key, "summary")
+    if cached is not None:
+        return parse_json_response(cached)
     
-    rsp = MODEL.generate_content(
-        combined_prompt,
-        generation_config={
-            "temperature": 0.2,
-            "max_output_tokens": 8192,
-            "response_mime_type": "application/json",
-        },
-    )
-    return rsp.text.strip()
+    rsp = MODEL.generate_content(combined_prompt, generation_config=GENERATION_CONFIG)
+    text = rsp.text.strip()
+    data = parse_json_response(text)
+    # Unparseable output is not cached, so the next run asks again
+    if data is not None:
+        store_response(key, text, "summary")
+    return data
+
+# Per-chunk extraction instructions; kept constant and ahead of the transcript
+# text so repeated calls start with the same prefix
+CHUNK_INSTRUCTIONS = """
+        Analyze this Community Board meeting transcript chunk.
+        
+        Extract the following with MAXIMUM DETAIL:
+        
+        1. **Narrative Summary**: Write 2-3 paragraphs explaining what happened in this section.
+           Include speaker names, specific proposals, decisions, and key discussion points.
+        
+        2. **Topics**: For each distinct topic discussed:
+           - Title that describes the specific item (e.g., "215 West 95th Street Sidewalk Cafe Application")
+           - All speakers who addressed this topic
+           - Detailed 3-5 sentence summary of the discussion
+           - Any decisions made with vote counts
+           - Specific concerns or support expressed
+           - Key proposals or requests
+        
+        3. **Decisions**: List any formal decisions with:
+           - Exact item being decided
+           - Vote count if mentioned
+           - Outcome
+           - Context about why it matters
+        
+        4. **Public Concerns**: Specific concerns raised by anyone
+        
+        5. **Key Quotes**: Important statements that capture the essence of discussions
+        
+        Return JSON with structure:
+        {
+            "narrative": "detailed narrative of this chunk",
+            "topics": [/* list of topic objects */],
+            "decisions": [/* list of decision objects */],
+            "concerns": [/* list of specific concerns */],
+            "speakers": [/* list of speaker names */],
+            "key_quotes": [/* important quotes */]
+        }
+        """
 
 CHUNK_LEN = 15000  
+# Concurrent Gemini requests per meeting for the per-chunk pass
+SUMMARY_WORKERS = 4
 
 def chunk_text(text: str, size: int = CHUNK_LEN):
     """Smart chunking that tries to break at natural boundaries"""
-    for i in range(0, len(text), size):
-        chunk = text[i : i + size]
+    start = 0
+    while start < len(text):
+        chunk = text[start : start + size]
         
         # If not the last chunk, try to break at a sentence
-        if i + size < len(text):
+        if start + size < len(text):
             last_period = chunk.rfind('. ')
             if last_period > size * 0.8:  # Only if we're past 80% of chunk
                 chunk = chunk[:last_period + 1]
         
         yield chunk
+        # Resume right after this chunk, so text cut at a sentence break
+        # starts the next chunk instead of being skipped
+        start += len(chunk)
 
 def extract_meeting_type(title: str, transcript: str) -> str:
     """Extract the specific type of meeting"""
@@ -99,6 +169,30 @@ def extract_meeting_type(title: str, transcript: str) -> str:
     
     return "Community Board Meeting"
 
+def extract_chunk(i: int, total: int, chunk: str):
+    """Run the detailed extraction for one transcript chunk; None if it fails"""
+    # Static instructions first, so every chunk of every meeting shares one
+    # byte-identical prompt prefix; only the chunk position and text vary
+    chunk_prompt = f"""{CHUNK_INSTRUCTIONS}
+        This is chunk {i+1} of {total}.
+        
+        Transcript chunk:
+        ```
+        {chunk}
+        ```
+        """
+    
+    try:
+        chunk_data = call_gemini(SYSTEM_PROMPT, chunk_prompt)
+        if chunk_data is None:
+            raise ValueError("response is not valid JSON")
+        if not isinstance(chunk_data, dict):
+            raise ValueError(f"expected a JSON object, got {type(chunk_data).__name__}")
+        return chunk_data
+    except Exception as e:
+        logger.warning("Failed to process chunk %d: %s", i + 1, e)
+        return None
+
 def summarize_transcript(full_txt: str, meeting_date: str, title: str = None) -> MeetingSummary:
     """Generate a rich, detailed summary of the meeting"""
     
@@ -112,70 +206,26 @@ def summarize_transcript(full_txt: str, meeting_date: str, title: str = None) ->
     all_decisions = []
     all_concerns = []
     
-    for i, chunk in enumerate(chunks):
-        chunk_prompt = f"""
-        Analyze this Community Board meeting transcript (chunk {i+1} of {len(chunks)}).
-        
-        Extract the following with MAXIMUM DETAIL:
-        
-        1. **Narrative Summary**: Write 2-3 paragraphs explaining what happened in this section.
-           Include speaker names, specific proposals, decisions, and key discussion points.
-        
-        2. **Topics**: For each distinct topic discussed:
-           - Title that describes the specific item (e.g., "215 West 95th Street Sidewalk Cafe Application")
-           - All speakers who addressed this topic
-           - Detailed 3-5 sentence summary of the discussion
-           - Any decisions made with vote counts
-           - Specific concerns or support expressed
-           - Key proposals or requests
-        
-        3. **Decisions**: List any formal decisions with:
-           - Exact item being decided
-           - Vote count if mentioned
-           - Outcome
-           - Context about why it matters
-        
-        4. **Public Concerns**: Specific concerns raised by anyone
-        
-        5. **Key Quotes**: Important statements that capture the essence of discussions
-        
-        Transcript chunk:
-        ```
-        {chunk}
-        ```
-        
-        Return JSON with structure:
-        {{
-            "narrative": "detailed narrative of this chunk",
-            "topics": [/* list of topic objects */],
-            "decisions": [/* list of decision objects */],
-            "concerns": [/* list of specific concerns */],
-            "speakers": [/* list of speaker names */],
-            "key_quotes": [/* important quotes */]
-        }}
-        """
-        
-        try:
-            raw = call_gemini(SYSTEM_PROMPT, chunk_prompt)
-            if "```json" in raw:
-                raw = raw.split("```json")[1].split("```")[0].strip()
-            
-            chunk_data = json.loads(raw)
-            chunk_summaries.append(chunk_data.get("narrative", ""))
-            
-            # Collect all data
-            if "topics" in chunk_data:
-                all_topics.extend(chunk_data["topics"])
-            if "speakers" in chunk_data:
-                all_speakers.update(chunk_data["speakers"])
-            if "decisions" in chunk_data:
-                all_decisions.extend(chunk_data["decisions"])
-            if "concerns" in chunk_data:
-                all_concerns.extend(chunk_data["concerns"])
-                
-        except Exception as e:
-            print(f"Warning: Failed to process chunk {i+1}: {e}")
+    # The per-chunk calls are network-bound and independent, so run them
+    # concurrently; results are merged in transcript order
+    with ThreadPoolExecutor(max_workers=max(1, min(SUMMARY_WORKERS, len(chunks)))) as executor:
+        chunk_results = list(executor.map(
+            extract_chunk, range(len(chunks)), [len(chunks)] * len(chunks), chunks))
+    
+    for chunk_data in chunk_results:
+        if chunk_data is None:
             continue
+        chunk_summaries.append(chunk_data.get("narrative", ""))
+        
+        # Collect all data
+        if "topics" in chunk_data:
+            all_topics.extend(chunk_data["topics"])
+        if "speakers" in chunk_data:
+            all_speakers.update(chunk_data["speakers"])
+        if "decisions" in chunk_data:
+            all_decisions.extend(chunk_data["decisions"])
+        if "concerns" in chunk_data:
+            all_concerns.extend(chunk_data["concerns"])
     
     # Second pass: Create comprehensive summary
     consolidation_prompt = f"""
@@ -231,14 +281,12 @@ def summarize_transcript(full_txt: str, meeting_date: str, title: str = None) ->
     The committee also reviewed a sidewalk cafe application for 215 West 95th Street, where the applicant agreed to community requests for reduced hours and improved maintenance. After extensive negotiation, the committee voted 8-2-1 to approve the application with conditions. Additionally, the Belnord's proposal to lease retail space to Chase Bank sparked debate about the concentration of banks on Broadway, though the committee ultimately voted to take no position, recognizing the as-of-right nature of the lease."
     """
     
-    raw_final = call_gemini(schema_with_example, consolidation_prompt)
-    
-    if "```json" in raw_final:
-        raw_final = raw_final.split("```json")[1].split("```")[0].strip()
+    data = call_gemini(schema_with_example, consolidation_prompt)
     
     try:
-        # Parse and enhance the data
-        data = json.loads(raw_final)
+        # Enhance the parsed data
+        if not isinstance(data, dict):
+            raise ValueError("response is not a JSON object")
         
         # Calculate totals
         total_decisions = len(data.get("key_decisions", []))
@@ -276,7 +324,7 @@ def summarize_transcript(full_txt: str, meeting_date: str, title: str = None) ->
         return final
         
     except Exception as e:
-        print(f"Error creating final summary: {e}")
+        logger.error("Error creating final summary: %s", e)
         # Fallback with whatever we have
         return MeetingSummary(
             meeting_date=meeting_date,
@@ -49,4 +49,19 @@ class MeetingSummary(BaseModel):
     # Meeting metadata
     total_decisions: int = 0
     total_action_items: int = 0
-    primary_focus: str = Field(default="", description="Main focus of the meeting")
\ No newline at end of file
+    primary_focus: str = Field(default="", description="Main focus of the meeting")
+
+class SegmentDecision(BaseModel):
+    item: str = Field(description="What was decided")
+    context: str = Field(description="Why it was decided and any details")
+    vote: str = Field(description="Vote count if any, otherwise 'No formal vote'")
+
+class SegmentAnalysis(BaseModel):
+    """Structured output for a single transcript segment in CBAnalyzer"""
+    main_topics: List[str] = Field(description="Specific topics discussed")
+    decisions: List[SegmentDecision] = Field(description="Only items that were actually voted on")
+    concerns: List[str] = Field(description="Specific concerns raised")
+    speakers: List[str] = Field(description="Names and roles if mentioned")
+    action_items: List[str] = Field(description="Follow-up items mentioned")
+    important_dates: List[str] = Field(description="Dates mentioned, e.g. hearings or deadlines")
+    addresses: List[str] = Field(description="Street addresses mentioned")
@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fetch_videos import CBChannelFetcher
+
+
+class BackfillCbNumbersTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), 'cb_meetings.db')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE processed_videos (
+                    video_id TEXT PRIMARY KEY, title TEXT, cb_number INTEGER, cb_district TEXT)
+            """)
+            conn.executemany("INSERT INTO processed_videos VALUES (?, ?, ?, ?)", [
+                ('a', 'CB7 Full Board Meeting', None, None),
+                ('b', 'Community Board 5 Land Use Committee', None, None),
+                ('c', 'Town Hall Meeting', None, None),
+                ('d', 'CB 3 Parks Committee', 4, 'Brooklyn'),
+            ])
+        self.fetcher = CBChannelFetcher(self.db_path)
+
+    def tearDown(self):
+        self.fetcher.close_connections()
+
+    def test_tags_only_untagged_videos(self):
+        self.assertEqual(self.fetcher.backfill_cb_numbers(), 2)
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT video_id, cb_number, cb_district FROM processed_videos ORDER BY video_id").fetchall()
+        self.assertEqual(rows, [
+            ('a', 7, 'Manhattan'),
+            ('b', 5, 'Manhattan'),
+            ('c', None, None),
+            ('d', 4, 'Brooklyn'),
+        ])
+
+    def test_nothing_left_to_tag(self):
+        self.fetcher.backfill_cb_numbers()
+        self.assertEqual(self.fetcher.backfill_cb_numbers(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# main opens cb_meetings.db relative to the working directory at import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault('GEMINI_API_KEY', 'test')
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('GEMINI_CACHE_PATH', os.path.join(os.getcwd(), 'cache.db'))
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class ReprocessVideoTest(unittest.TestCase):
+    def setUp(self):
+        with main.processor.get_db_connection() as conn:
+            conn.execute("DELETE FROM processed_videos WHERE video_id = 'abc123'")
+            conn.execute("DELETE FROM meeting_analysis WHERE video_id = 'abc123'")
+            conn.execute("""
+                INSERT INTO processed_videos (video_id, title, url, published_at, status, cb_number,
+                                              processing_attempts, meeting_date)
+                VALUES ('abc123', 'CB7 Full Board', 'https://youtu.be/abc123', '2026-01-10',
+                        'completed', 7, 1, '2026-01-06')
+            """)
+            conn.execute("""
+                INSERT INTO meeting_analysis (video_id, analysis_json, meeting_date)
+                VALUES ('abc123', '{}', '2026-01-06')
+            """)
+
+    def test_requeue_keeps_meeting_date(self):
+        video_info = {'video_id': 'abc123', 'title': 'CB7 Full Board', 'upload_date': '2026-01-10'}
+        with mock.patch.object(main.processor, 'extract_video_info', return_value=video_info), \
+                mock.patch.object(main, 'core_video_processing_logic') as process:
+            response = TestClient(main.app).post(
+                '/process-youtube-async', json={'url': 'https://youtu.be/abc123', 'cb_number': 7})
+
+        self.assertEqual(response.status_code, 200)
+        process.assert_called_once_with('abc123', 'CB7 Full Board', 'https://youtu.be/abc123')
+        with main.processor.get_db_connection(read_only=True) as conn:
+            row = conn.execute(
+                "SELECT status, meeting_date, cb_number FROM processed_videos WHERE video_id = 'abc123'"
+            ).fetchone()
+        self.assertEqual(tuple(row), ('queued', '2026-01-06', 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import random
+import re
+import tempfile
+import unittest
+
+os.environ.setdefault('GEMINI_API_KEY', 'test')
+os.environ.setdefault('GEMINI_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'cache.db'))
+
+from analyzer import CBAnalyzer, VoteRecord
+from rapidfuzz import fuzz
+
+
+PHRASES = [
+    "The motion approved unanimously.",
+    "Let's call the question. The motion is approved.",
+    "Are we ready for the vote? The vote passes.",
+    "We went to the park to see the park to talk. Approved unanimously.",
+    "The vote is 7 to 2 to 0 to 1, the motion has passed.",
+    "Seven to two to zero to one, motion approved unanimously.",
+    "Committee vote is 35-0-0-0. Motion to approve the liquor license for 123 Main Street.",
+]
+
+
+def original_deduplicate(votes):
+    """The all-pairs loop deduplicate_votes replaced, kept as the reference."""
+    unique_votes = []
+    for vote in votes:
+        is_duplicate = False
+        for existing in unique_votes:
+            if abs(vote.position - existing.position) < 200:
+                if vote.confidence > existing.confidence:
+                    unique_votes.remove(existing)
+                else:
+                    is_duplicate = True
+                    break
+            similarity = fuzz.ratio(vote.item.lower(), existing.item.lower())
+            if similarity > 80 and vote.vote_count == existing.vote_count:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            unique_votes.append(vote)
+    return unique_votes
+
+
+def random_votes(rng: random.Random):
+    votes = []
+    position = 0
+    for i in range(rng.randint(0, 12)):
+        position += rng.choice([0, 30, 120, 199, 200, 250, 600])
+        votes.append(VoteRecord(
+            item=rng.choice(['Application: 12 Main St', 'Application: 12 Main St.',
+                             'Park renovation', 'Bike lanes']),
+            outcome='Approved',
+            vote_count=rng.choice(['Passed', '5-1-0-0', 'Unanimous']),
+            vote_type='formal_vote',
+            context_start=0,
+            context_end=0,
+            position=position,
+            raw_text=str(i),
+            confidence=rng.choice([0.7, 0.8, 0.85, 0.9, 0.95])
+        ))
+    return votes
+
+
+def baseline_votes(analyzer: CBAnalyzer, transcript: str):
+    """Scan each pattern on its own, as extract_all_votes originally did."""
+    votes = []
+    for p, vote_type, confidence in analyzer.vote_patterns:
+        for match in re.finditer(p, transcript, re.IGNORECASE):
+            start = max(0, match.start() - 1000)
+            end = min(len(transcript), match.end() + 1000)
+            details = analyzer.parse_vote_match(
+                transcript, match.group(), vote_type, start, end, match.groups())
+            if details:
+                votes.append(VoteRecord(
+                    item=details['item'],
+                    outcome=details['outcome'],
+                    vote_count=details['vote_count'],
+                    vote_type=vote_type,
+                    context_start=start,
+                    context_end=end,
+                    position=match.start(),
+                    raw_text=match.group(),
+                    confidence=confidence,
+                    transcript=transcript
+                ))
+    votes.sort(key=lambda v: v.position)
+    return original_deduplicate(votes)
+
+
+FRAGMENTS = [
+    "The motion approved unanimously. ", "Let's call the question. ", "ready for the vote. ",
+    "The vote passes. ", "the vote fails 5-1-0-0 committee. ", "Committee vote is 35-0-0-0. ",
+    "seven to two to zero to one. ", "7 to 2 to 0 to 1. ", "Motion to approve the cafe at 215 West 95th Street. ",
+    "the motion has passed. ", "We went to the park to see the park to talk. ", "x" * 150 + " ",
+]
+
+
+def summarize(votes):
+    return [(v.vote_type, v.outcome, v.vote_count, v.confidence, v.position, v.raw_text, v.item)
+            for v in votes]
+
+
+class VoteExtractionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = CBAnalyzer()
+
+    def test_matches_per_pattern_scan(self):
+        for phrase in PHRASES:
+            with self.subTest(phrase=phrase):
+                self.assertEqual(summarize(self.analyzer.extract_all_votes(phrase)),
+                                 summarize(baseline_votes(self.analyzer, phrase)))
+
+    def test_random_transcripts_match_per_pattern_scan(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            transcript = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 15)))
+            self.assertEqual(summarize(self.analyzer.extract_all_votes(transcript)),
+                             summarize(baseline_votes(self.analyzer, transcript)))
+
+    def test_deduplicate_matches_all_pairs_loop(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            votes = random_votes(rng)
+            self.assertEqual([v.raw_text for v in self.analyzer.deduplicate_votes(votes)],
+                             [v.raw_text for v in original_deduplicate(votes)])
+
+    def test_distant_duplicate_keeps_nearby_vote(self):
+        transcript = ("5-1-0-0 committee approved the application for 12 Main Street. " + "x" * 200
+                      + " the vote fails 5-1-0-0 committee")
+        votes = self.analyzer.extract_all_votes(transcript)
+        self.assertEqual([(v.vote_type, v.position) for v in votes],
+                         [('formal_vote', 0), ('vote_fails', 264)])
+
+    def test_stronger_overlapping_pattern_wins(self):
+        votes = self.analyzer.extract_all_votes("The motion approved unanimously.")
+        self.assertEqual([(v.vote_type, v.vote_count, v.confidence) for v in votes],
+                         [('unanimous', 'Unanimous', 0.95)])
+
+
+if __name__ == '__main__':
+    unittest.main()